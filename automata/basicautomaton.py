@@ -1,24 +1,107 @@
 import json
+import os
 from abc import abstractmethod
+from automata.binary import load_binary, save_binary
+from automata.interned import InternedAutomaton
+from automata.stream import stream_definition
+
+# Files already validated in this process, as (kind, path, modification time, size),
+# so that loading them again skips validation until they change
+validated_files = set()
 
 # Base class for all automata
 class BasicAutomaton:
 
+    # Kind of automaton in the binary format (see automata/binary.py), None if it can't be saved in it
+    kind = None
+    # Whether the loaded definition passed validation
+    validated = False
+    # Definition as given, None once compact() dropped it
+    definition = None
+    # Compact form of the definition, built on demand by intern()
+    interned = None
+
+    # The automaton's definition, in the usual JSON schema
+    # After compact(), it is rebuilt from the interned form the first time it is needed, and
+    # kept again from then on
+    # The automaton runs on the interned form, so changes made to the definition in place are
+    # only seen after calling invalidate(), while setting a new definition takes effect at once
+    @property
+    def data(self) -> dict | None:
+        if self.definition is None and self.interned is not None:
+            self.definition = self.interned.to_data()
+        return self.definition
+
+
+    # Setting a new definition drops everything built from the previous one
+    @data.setter
+    def data(self, data: dict | None) -> None:
+        self.definition = data
+        self.invalidate()
+
+
+    # Drops everything built from the definition, such as the interned form, which is built
+    # again the next time it is needed, so that changes made to data in place are seen
+    def invalidate(self) -> None:
+        self.interned = None
+
     # Loads an automaton from a file
-    def load_automata(self, filename: str) -> None:
+    # A file that was already validated, and hasn't changed since, isn't validated again,
+    # and validate can be set to False to skip validation for trusted files
+    def load_automata(self, filename: str, validate: bool = True) -> None:
+        status = os.stat(filename)
+        key = (self.kind, os.path.realpath(filename), status.st_mtime_ns, status.st_size)
+
         with open(filename, "r+") as file:
-            self.data = json.load(file)
-        
+            self.load_data(json.load(file), validate and key not in validated_files)
+
+        if validate:
+            validated_files.add(key)
+            self.validated = True
+
+
+    # Loads an automaton from a JSON file without parsing it whole, for very large definitions
+    # The file is read in chunks, strings are interned, comments are dropped, and rules are
+    # validated as they are read (see automata/stream.py)
+    def stream_automata(self, filename: str) -> None:
+        if self.kind is None:
+            raise ValueError(f"{type(self).__name__} can't be streamed")
+        self.load_data(stream_definition(filename, self.kind), validate=False)
+        self.validated = True
+
+
+    # Loads an automaton from an already parsed definition
+    # Validation can be skipped for definitions known to be valid
+    def load_data(self, data: dict, validate: bool = True) -> None:
+        self.data = data
+
         # Do pre-validation processing
         self.preprocess()
 
         # Check if the data is valid
-        self.validate_automata()
+        if validate:
+            self.validate_automata()
+        self.validated = validate
 
         # If it is, put the automaton in its starting state
         self.starting_state()
 
 
+    # Interns the states and symbols and puts the rules in flat arrays (see automata/interned.py)
+    # Called on demand whenever the interned form was dropped, see invalidate()
+    def intern(self) -> InternedAutomaton:
+        self.interned = InternedAutomaton(self.kind, self.definition)
+        return self.interned
+
+
+    # Keeps only the interned form of the definition, which takes a fraction of its memory
+    # self.data keeps working, but accessing it rebuilds the definition (and its memory use)
+    def compact(self) -> None:
+        if self.interned is None:
+            self.intern()
+        self.definition = None
+
+
     # Saves an automaton to a file
     def save_automata(self, filename: str) -> None:
         if self.data is not None:
@@ -26,6 +109,32 @@ class BasicAutomaton:
                 json.dump(self.data, file, indent=4)
 
     
+    # Loads an automaton from a file in the binary format, which is memory-mapped
+    # Files saved from a validated definition aren't validated again, their checksum
+    # making sure they weren't changed since, and are loaded straight into the interned
+    # form, the definition only being built if data is needed
+    def load(self, filename: str) -> None:
+        kind, loaded, validated = load_binary(filename)
+        if kind != self.kind:
+            raise ValueError(f"Expected a {self.kind} in {filename}, got a {kind}")
+
+        if validated:
+            self.data = None
+            self.interned = loaded
+            self.starting_state()
+        else:
+            self.load_data(loaded)
+        self.validated = True
+
+
+    # Saves an automaton to a file in the binary format
+    def save(self, filename: str) -> None:
+        if self.kind is None:
+            raise ValueError(f"{type(self).__name__} can't be saved in the binary format")
+        if self.data is not None:
+            save_binary(filename, self.kind, self.data, self.validated)
+
+
     # Performs preprocessing actions immediately after loading, 
     # but before validating the automaton
     @abstractmethod
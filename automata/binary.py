@@ -0,0 +1,276 @@
+import mmap
+import numpy as np
+import struct
+import zlib
+from array import array
+from automata.interned import InternedAutomaton, Names
+
+# Compact binary format for automata definitions
+# The file starts with a header: an 8 byte magic string, the kind of automaton, flags,
+# a CRC32 checksum and the payload's length
+# The checksum covers the header (with the checksum itself zeroed) and the payload, so the
+# kind and the flags can't change unnoticed either
+# The payload holds every string of the definition once, as UTF-8 bytes with an offsets
+# array, followed by columns of little-endian 32 bit string ids, in the order of SECTIONS
+# Every column is written as its length followed by its values, padded to 4 bytes
+MAGIC = b"AUTOMATA"
+HEADER = struct.Struct("<8sBBHIQ")
+LENGTH = struct.Struct("<I")
+
+# Kinds of automata, as stored in the header
+KINDS = ["DFA", "NFA", "TM"]
+# Flag set in files saved from a definition that passed validation
+VALIDATED = 1
+
+# Columns of every kind of automaton
+# "keys" are the states the ruleset has entries for, in order, then rules are given one per row
+# NFA rules point to the slice of "targets" between their start and the next rule's start
+SECTIONS = {
+    "DFA": ["states", "accepting", "symbols", "initial", "keys", "rule_state", "rule_symbol", "rule_target"],
+    "NFA": ["states", "accepting", "symbols", "initial", "keys", "rule_state", "rule_symbol", "rule_start", "targets"],
+    "TM": ["states", "accepting", "symbols", "initial", "blank", "increment", "decrement",
+           "old_state", "old_tape", "new_state", "new_tape", "shift"]
+}
+# Members of the definition holding a single string
+SINGLE = ["initial", "blank", "increment", "decrement"]
+# Members of TM rules, in the order of the TM's rule columns
+TM_RULE = ["old_state", "old_tape", "new_state", "new_tape", "shift"]
+
+
+# Splits a definition into columns of strings, following SECTIONS
+def to_columns(kind: str, data: dict) -> dict[str, list[str]]:
+    columns = {name: [data[name]] if name in SINGLE else list(data[name])
+               for name in SECTIONS[kind] if name in data}
+
+    if kind == "NFA" and columns["symbols"][-1:] == ["EPSILON"]:
+        # NFA.preprocess adds EPSILON again when loading
+        columns["symbols"].pop()
+
+    if kind == "TM":
+        for name in TM_RULE:
+            columns[name] = [rule[name] for rule in data["ruleset"]]
+        return columns
+
+    columns["keys"] = list(data["ruleset"])
+    columns["rule_state"], columns["rule_symbol"] = [], []
+    targets = columns["rule_target" if kind == "DFA" else "targets"] = []
+    if kind == "NFA":
+        columns["rule_start"] = []
+
+    for state, action in data["ruleset"].items():
+        for symbol, target in action.items():
+            columns["rule_state"].append(state)
+            columns["rule_symbol"].append(symbol)
+            if kind == "DFA":
+                targets.append(target)
+            else:
+                columns["rule_start"].append(len(targets))
+                targets += target
+
+    return columns
+
+
+# Builds a definition back from its columns of strings
+def from_columns(kind: str, columns: dict[str, list[str]]) -> dict:
+    data = {name: columns[name][0] if name in SINGLE else columns[name]
+            for name in ["states", "accepting", "symbols"] + [name for name in SINGLE if name in columns]}
+
+    if kind == "TM":
+        data["ruleset"] = [dict(zip(TM_RULE, rule)) for rule in zip(*(columns[name] for name in TM_RULE))]
+        return data
+
+    ruleset = data["ruleset"] = {state: dict() for state in columns["keys"]}
+    if kind == "DFA":
+        for state, symbol, target in zip(columns["rule_state"], columns["rule_symbol"], columns["rule_target"]):
+            ruleset[state][symbol] = target
+    else:
+        targets, ends = columns["targets"], columns["rule_start"][1:] + [len(columns["targets"])]
+        for state, symbol, start, end in zip(columns["rule_state"], columns["rule_symbol"], columns["rule_start"], ends):
+            ruleset[state][symbol] = targets[start:end]
+
+    return data
+
+
+# Encodes a definition in the binary format, with validated telling whether it passed validation
+def encode(kind: str, data: dict, validated: bool) -> bytes:
+    columns = to_columns(kind, data)
+
+    # Intern every string, in order of appearance
+    ids = dict()
+    for name in SECTIONS[kind]:
+        # Rule starts are offsets, not strings
+        if name != "rule_start":
+            for string in columns[name]:
+                ids.setdefault(string, len(ids))
+
+    encoded = [string.encode() for string in ids]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    np.cumsum([len(string) for string in encoded], out=offsets[1:])
+    blob = b"".join(encoded)
+    parts = [LENGTH.pack(len(encoded)), offsets.tobytes(), LENGTH.pack(len(blob)), blob, bytes(-len(blob) % 4)]
+
+    for name in SECTIONS[kind]:
+        values = columns[name] if name == "rule_start" else [ids[string] for string in columns[name]]
+        parts += [LENGTH.pack(len(values)), np.array(values, dtype="<i4").tobytes()]
+
+    payload = b"".join(parts)
+    fields = (MAGIC, KINDS.index(kind), VALIDATED if validated else 0, 0)
+    checksum = zlib.crc32(payload, zlib.crc32(HEADER.pack(*fields, 0, len(payload))))
+    return HEADER.pack(*fields, checksum, len(payload)) + payload
+
+
+# Reads an automaton in the binary format, given as any buffer (bytes, mmap, ...)
+# Returns its kind, its strings, its columns as arrays of string ids (or offsets, for "rule_start"),
+# copied out of the buffer, and whether it passed validation when it was saved
+# Raises ValueError if the buffer isn't in the format or doesn't match its checksum
+def read_columns(buffer) -> tuple[str, list[str], dict[str, np.ndarray], bool]:
+    if len(buffer) < HEADER.size:
+        raise ValueError("Not an automaton in the binary format")
+    magic, kind, flags, reserved, checksum, length = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not an automaton in the binary format")
+    if len(buffer) != HEADER.size + length:
+        raise ValueError(f"Expected a payload of {length} bytes, got {len(buffer) - HEADER.size}")
+
+    # Views are released before returning, so that a memory-mapped buffer can be closed
+    with memoryview(buffer) as whole, whole[HEADER.size:] as view:
+        header = HEADER.pack(magic, kind, flags, reserved, 0, length)
+        if zlib.crc32(view, zlib.crc32(header)) != checksum:
+            raise ValueError("Checksum mismatch, the file is corrupted")
+        if kind >= len(KINDS):
+            raise ValueError("Not an automaton in the binary format")
+        kind = KINDS[kind]
+
+        # A payload matching its checksum can still be malformed, if it was written that way
+        try:
+            # String table
+            count, = LENGTH.unpack_from(view)
+            offsets = np.frombuffer(view, dtype="<u4", count=count + 1, offset=4).tolist()
+            position = 4 + 4 * (count + 1)
+            size, = LENGTH.unpack_from(view, position)
+            blob = bytes(view[position + 4:position + 4 + size])
+            strings = [blob[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+            position += 4 + size + (-size % 4)
+
+            # Columns, copied so that nothing refers to the buffer any more
+            columns = dict()
+            for name in SECTIONS[kind]:
+                count, = LENGTH.unpack_from(view, position)
+                columns[name] = np.frombuffer(view, dtype="<i4", count=count, offset=position + 4).astype(np.int64)
+                position += 4 + 4 * count
+        except (struct.error, UnicodeDecodeError, ValueError) as error:
+            raise ValueError(f"Malformed payload: {error}") from None
+
+    return kind, strings, columns, bool(flags & VALIDATED)
+
+
+# Decodes an automaton in the binary format, given as any buffer (bytes, mmap, ...)
+# Returns its kind, its definition, and whether it passed validation when it was saved
+# Raises ValueError if the buffer isn't in the format or doesn't match its checksum
+def decode(buffer) -> tuple[str, dict, bool]:
+    kind, strings, columns, validated = read_columns(buffer)
+    return kind, to_definition(kind, strings, columns), validated
+
+
+# Builds the definition of a decoded automaton, turning its columns back into strings
+def to_definition(kind: str, strings: list[str], columns: dict[str, np.ndarray]) -> dict:
+    try:
+        return from_columns(kind, {name: values.tolist() if name == "rule_start" else [strings[value] for value in values.tolist()]
+                                   for name, values in columns.items()})
+    except (IndexError, KeyError, ValueError) as error:
+        raise ValueError(f"Malformed payload: {error}") from None
+
+
+# Builds the interned form of a decoded automaton (see automata/interned.py) straight from
+# its columns of string ids, without building its definition
+# Only the state and symbol names are looked up, every rule is turned into ids as a whole column
+def to_interned(kind: str, strings: list[str], columns: dict[str, np.ndarray]) -> InternedAutomaton:
+    interned = InternedAutomaton(kind)
+    try:
+        # Interned state and symbol id of every string naming one, -1 for the others
+        state_of, symbol_of = np.full(len(strings), -1), np.full(len(strings), -1)
+        interned.states, interned.symbols = Names(), Names()
+        for string in columns["states"].tolist():
+            state_of[string] = interned.states.add(strings[string])
+        for string in columns["symbols"].tolist():
+            symbol_of[string] = interned.symbols.add(strings[string])
+        if kind == "NFA":
+            # NFA.preprocess adds EPSILON when loading a definition, see to_columns
+            epsilon = interned.symbols.add("EPSILON")
+            if "EPSILON" in strings:
+                symbol_of[strings.index("EPSILON")] = epsilon
+
+        # Returns a column turned into state or symbol ids, rejecting names that are neither
+        def ids(name: str, table: np.ndarray) -> np.ndarray:
+            values = table[columns[name]]
+            if (values == -1).any():
+                raise ValueError(f"unknown name in {name}")
+            return values
+
+        initial, = ids("initial", state_of)
+        interned.initial = int(initial)
+        accepting = np.zeros(len(interned.states), dtype=np.uint8)
+        accepting[ids("accepting", state_of)] = 1
+        interned.accepting = bytearray(accepting.tobytes())
+        size = len(interned.states) * len(interned.symbols)
+
+        if kind == "DFA":
+            table = np.full(size, -1, dtype=np.int32)
+            table[interned.index(ids("rule_state", state_of), ids("rule_symbol", symbol_of))] = ids("rule_target", state_of)
+            interned.table = array("i", table.tobytes())
+
+        elif kind == "NFA":
+            indices = interned.index(ids("rule_state", state_of), ids("rule_symbol", symbol_of))
+            targets = ids("targets", state_of)
+            starts = columns["rule_start"]
+            lengths = np.diff(starts, append=len(targets))
+            if (lengths < 0).any() or (starts < 0).any():
+                raise ValueError("rule starts out of order")
+            present = np.zeros(size, dtype=np.uint8)
+            present[indices] = 1
+            interned.present = bytearray(present.tobytes())
+
+            # Next states gathered in index order, like InternedAutomaton does from a definition
+            order = np.argsort(indices, kind="stable")
+            counts = np.bincount(indices, weights=lengths, minlength=size).astype(np.int64)
+            offsets = np.zeros(size + 1, dtype=np.int32)
+            np.cumsum(counts, out=offsets[1:])
+            lengths = lengths[order]
+            positions = np.repeat(starts[order] - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            interned.offsets, interned.targets = array("i", offsets.tobytes()), array("i", targets[positions].astype(np.int32).tobytes())
+
+        else:
+            interned.blank, interned.increment, interned.decrement = (strings[columns[name][0]] for name in ["blank", "increment", "decrement"])
+            indices = interned.index(ids("old_state", state_of), ids("old_tape", symbol_of))
+            # If several rules match, the first one is used
+            indices, first = np.unique(indices, return_index=True)
+            table, writes, shifts = np.full(size, -1, dtype=np.int32), np.zeros(size, dtype=np.int32), np.zeros(size, dtype=np.int8)
+            table[indices] = ids("new_state", state_of)[first]
+            writes[indices] = ids("new_tape", symbol_of)[first]
+            shift = columns["shift"][first]
+            shifts[indices] = np.where(shift == columns["increment"][0], 1, np.where(shift == columns["decrement"][0], -1, 0))
+            interned.table, interned.writes, interned.shifts = array("i", table.tobytes()), array("i", writes.tobytes()), array("b", shifts.tobytes())
+    except (IndexError, ValueError) as error:
+        raise ValueError(f"Malformed payload: {error}") from None
+
+    return interned
+
+
+# Saves a definition to a file in the binary format
+def save_binary(filename: str, kind: str, data: dict, validated: bool) -> None:
+    with open(filename, "wb") as file:
+        file.write(encode(kind, data, validated))
+
+
+# Loads an automaton from a file in the binary format, memory-mapping it instead of reading it
+# Returns its kind, its contents and whether it passed validation when it was saved: files saved
+# from a validated definition are given in interned form, built straight from their columns, while
+# the others are given as a definition, so that they can be validated
+def load_binary(filename: str) -> tuple[str, InternedAutomaton | dict, bool]:
+    with open(filename, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            kind, strings, columns, validated = read_columns(mapped)
+
+    if validated:
+        return kind, to_interned(kind, strings, columns), True
+    return kind, to_definition(kind, strings, columns), False
@@ -1,3 +1,7 @@
+# Reference implementation of the type checks, one check at a time
+# The automata are validated by validator.py instead, this module is kept so that
+# bench_validation.py can compare both
+
 from typing import Any, TypeVar, get_origin, get_args
 from collections.abc import Mapping, Iterable
 
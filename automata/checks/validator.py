@@ -0,0 +1,129 @@
+# Single-pass validation of automata definitions, checking the same constraints as
+# typecheck.py and valuecheck.py together, but with the state and symbol lists turned
+# into sets once, so that checking a rule takes constant time
+# Instead of stopping at the first problem, every error is collected, with its location
+
+# Members holding a list of strings, and the ones holding a single string for every kind of automaton
+LIST_MEMBERS = ["states", "accepting", "symbols"]
+STRING_MEMBERS = {"DFA": ["initial"], "NFA": ["initial"], "TM": ["blank", "initial", "increment", "decrement"]}
+# Fields every TM rule needs
+TM_FIELDS = ["old_state", "old_tape", "new_state", "new_tape", "shift"]
+
+
+# Returns True if an object is a list of strings
+def is_string_list(object) -> bool:
+    return isinstance(object, list) and all(isinstance(value, str) for value in object)
+
+
+# Checks the rules of a single state of a DFA or NFA, given as {symbol: target(s)}
+def check_action(state: str, action: dict, states: set, symbols: set, multiple: bool, errors: list) -> None:
+    if not isinstance(action, dict):
+        errors.append((TypeError, f"ruleset[{state!r}]: expected a dictionary, got {type(action).__name__}"))
+        return
+    if state not in states:
+        errors.append((ValueError, f"ruleset[{state!r}]: a rule was given for {state}, which is not in the state list"))
+
+    for symbol, target in action.items():
+        location = f"ruleset[{state!r}][{symbol!r}]"
+        if symbol not in symbols:
+            errors.append((ValueError, f"{location}: {symbol} is not in the symbol list"))
+
+        # NFA rules point to lists of states, DFA ones to a single state
+        if multiple:
+            if not is_string_list(target):
+                errors.append((TypeError, f"{location}: expected a list of states, got {target!r}"))
+                continue
+            for index, next_state in enumerate(target):
+                if next_state not in states:
+                    errors.append((ValueError, f"{location}[{index}]: {next_state} is not in the state list"))
+        else:
+            if not isinstance(target, str):
+                errors.append((TypeError, f"{location}: expected a state, got {target!r}"))
+            elif target not in states:
+                errors.append((ValueError, f"{location}: {target} is not in the state list"))
+
+
+# Checks a single TM rule, a dictionary with the fields in TM_FIELDS
+# shifts is the set of the increment and decrement symbols
+def check_tm_rule(index: int, rule: dict, states: set, symbols: set, shifts: set, errors: list) -> None:
+    location = f"ruleset[{index}]"
+    if not isinstance(rule, dict) or not all(isinstance(key, str) and isinstance(value, str) for key, value in rule.items()):
+        errors.append((TypeError, f"{location}: expected a dictionary of strings, got {rule!r}"))
+        return
+
+    missing = [field for field in TM_FIELDS if field not in rule]
+    if missing:
+        errors.append((ValueError, f"{location}: the rule does not have {", ".join(missing)} defined"))
+        return
+
+    for field in ["old_state", "new_state"]:
+        if rule[field] not in states:
+            errors.append((ValueError, f"{location}: {field} {rule[field]} is not in the state list"))
+    for field in ["old_tape", "new_tape"]:
+        if rule[field] not in symbols:
+            errors.append((ValueError, f"{location}: {field} {rule[field]} is not in the list of tape symbols"))
+    if rule["shift"] not in shifts:
+        errors.append((ValueError, f"{location}: unrecognized shift symbol {rule["shift"]}"))
+
+
+# Checks that every member of a definition is there and has the right type
+# Values can only be checked once this finds no errors
+def check_members(kind: str, data: dict, errors: list) -> None:
+    for member in LIST_MEMBERS + STRING_MEMBERS[kind] + ["ruleset"]:
+        if member not in data:
+            errors.append((ValueError, f"{member}: missing member"))
+    for member in LIST_MEMBERS:
+        if member in data and not is_string_list(data[member]):
+            errors.append((TypeError, f"{member}: expected a list of strings"))
+    for member in STRING_MEMBERS[kind]:
+        if member in data and not isinstance(data[member], str):
+            errors.append((TypeError, f"{member}: expected a string, got {type(data[member]).__name__}"))
+    if "ruleset" in data and not isinstance(data["ruleset"], list if kind == "TM" else dict):
+        expected = "a list" if kind == "TM" else "a dictionary"
+        errors.append((TypeError, f"ruleset: expected {expected}, got {type(data["ruleset"]).__name__}"))
+
+
+# Checks the members outside of the ruleset against the sets of states and symbols
+def check_values(kind: str, data: dict, states: set, symbols: set, errors: list) -> None:
+    if data["initial"] not in states:
+        errors.append((ValueError, f"initial: initial state {data["initial"]} is not in the state list"))
+    for index, state in enumerate(data["accepting"]):
+        if state not in states:
+            errors.append((ValueError, f"accepting[{index}]: accepting state {state} is not in the state list"))
+    if kind == "TM" and data["blank"] not in symbols:
+        errors.append((ValueError, f"blank: blank symbol {data["blank"]} is not in the tape symbols list"))
+
+
+# Returns every error in a definition of the given kind ("DFA", "NFA" or "TM"),
+# as (exception type, message) pairs, with messages giving where each error is
+def find_errors(kind: str, data: dict) -> list[tuple[type, str]]:
+    errors = []
+    check_members(kind, data, errors)
+    if errors:
+        return errors
+
+    # Sets built once, for every membership check that follows
+    states, symbols = set(data["states"]), set(data["symbols"])
+    check_values(kind, data, states, symbols, errors)
+
+    if kind == "TM":
+        shifts = {data["increment"], data["decrement"]}
+        for index, rule in enumerate(data["ruleset"]):
+            check_tm_rule(index, rule, states, symbols, shifts, errors)
+    else:
+        for state, action in data["ruleset"].items():
+            check_action(state, action, states, symbols, kind == "NFA", errors)
+
+    return errors
+
+
+# Raises an exception listing every error found in a definition of the given kind
+# The exception has the type of the first error, as the older checks would have raised it
+def raise_errors(kind: str, errors: list[tuple[type, str]]) -> None:
+    if errors:
+        raise errors[0][0](f"{len(errors)} error(s) in the {kind} definition:\n" + "\n".join(message for _, message in errors))
+
+
+# Validates a definition of the given kind, raising an exception listing every error found
+def validate(kind: str, data: dict) -> None:
+    raise_errors(kind, find_errors(kind, data))
@@ -1,3 +1,7 @@
+# Reference implementation of the value checks, one check at a time
+# The automata are validated by validator.py instead, this module is kept so that
+# bench_validation.py can compare both
+
 # Asserts the validity of the initial state
 # (i.e. found in the list of possible states)
 def assert_initial(data: dict) -> None:
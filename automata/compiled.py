@@ -0,0 +1,207 @@
+import numpy as np
+from automata.interned import InternedAutomaton
+from collections.abc import Iterable
+from itertools import chain
+
+# Integer-indexed form of a DFA, built once from its interned form (see automata/interned.py)
+# States and symbols keep the ids they were interned with, in the order of their lists
+class CompiledDFA:
+
+    # Builds the dense transition table from the DFA's interned form
+    def __init__(self, interned: InternedAutomaton):
+        # Share the interning tables
+        self.states, self.state_ids = interned.states.names, interned.states.ids
+        self.symbols, self.symbol_ids = interned.symbols.names, interned.symbols.ids
+
+        self.initial = interned.initial
+
+        # Accepting flags, indexed by state id
+        self.accepting = np.frombuffer(interned.accepting, dtype=np.uint8).astype(bool)
+
+        # The table has one row per state and one column per symbol
+        # A missing rule is a self-loop, i.e. the state is its own sink,
+        # which keeps the "no rule means staying in place" behavior
+        rules = np.frombuffer(interned.table, dtype=np.int32).reshape(len(self.states), len(self.symbols))
+        self.table = np.where(rules == -1, np.arange(len(self.states), dtype=np.int32)[:, np.newaxis], rules)
+
+        # Per-symbol columns as plain lists, so that stepping from Python
+        # costs one dictionary lookup and one list index
+        self.columns = {symbol: self.table[:, index].tolist() for symbol, index in self.symbol_ids.items()}
+        self.accepting_list = self.accepting.tolist()
+
+        # Lockstep runs pad shorter inputs with an extra symbol id,
+        # whose column maps every state to itself
+        self.padding = len(self.symbols)
+        self.padded_table = np.hstack([self.table, np.arange(len(self.states), dtype=np.int32)[:, np.newaxis]])
+
+        # When every symbol is a single character, string inputs can be
+        # translated all at once, by looking up their code points
+        self.single_chars = all(len(symbol) == 1 for symbol in self.symbols)
+        if self.single_chars:
+            codes = np.array([ord(symbol) for symbol in self.symbols], dtype=np.uint32)
+            order = np.argsort(codes)
+            self.char_codes, self.char_ids = codes[order], order.astype(np.int32)
+
+
+    # Runs a sequence of symbols from a given state id and returns the final state id
+    def run(self, symbols: Iterable[str], state: int = None) -> int:
+        if state is None:
+            state = self.initial
+
+        columns = self.columns
+        try:
+            for symbol in symbols:
+                state = columns[symbol][state]
+        except KeyError:
+            raise ValueError(f"Symbol {symbol} not recognized") from None
+
+        return state
+
+
+    # Classifies a batch of inputs, each of them being a sequence of symbols
+    # Returns the accept flags and the final states' names
+    def run_many(self, inputs: Iterable[Iterable[str]]) -> tuple[list[bool], list[str]]:
+        accepted, finals = [], []
+        for symbols in inputs:
+            state = self.run(symbols)
+            accepted.append(self.accepting_list[state])
+            finals.append(self.states[state])
+
+        return accepted, finals
+
+
+    # Translates a batch of inputs into a padded matrix of symbol ids
+    # Row i holds input i, and positions past its end hold the padding id
+    def encode(self, inputs: Iterable[Iterable[str]]) -> np.ndarray:
+        inputs = list(inputs)
+        lengths = np.fromiter((len(symbols) for symbols in inputs), dtype=np.int64, count=len(inputs))
+        width = int(lengths.max()) if len(inputs) > 0 else 0
+
+        # Symbol ids of all inputs, concatenated
+        if self.single_chars and all(isinstance(symbols, str) for symbols in inputs):
+            flat = np.frombuffer("".join(inputs).encode("utf-32-le"), dtype=np.uint32)
+            position = np.minimum(np.searchsorted(self.char_codes, flat), len(self.char_codes) - 1)
+            unknown = self.char_codes[position] != flat
+            if unknown.any():
+                raise ValueError(f"Symbol {chr(flat[unknown][0])} not recognized")
+            flat = self.char_ids[position]
+        else:
+            try:
+                flat = np.fromiter(map(self.symbol_ids.__getitem__, chain.from_iterable(inputs)),
+                                   dtype=np.int32, count=int(lengths.sum()))
+            except KeyError as error:
+                raise ValueError(f"Symbol {error.args[0]} not recognized") from None
+
+        # Scatter the ids into the padded matrix, row by row
+        codes = np.full((len(inputs), width), self.padding, dtype=np.int32)
+        codes[np.arange(width) < lengths[:, np.newaxis]] = flat
+        return codes
+
+
+    # Runs a whole batch of inputs in lockstep, one table lookup per time step
+    # for the entire state vector, and returns the final state ids
+    def final_states(self, inputs: Iterable[Iterable[str]]) -> np.ndarray:
+        # Time-major codes, so that each step reads one contiguous row
+        codes = np.ascontiguousarray(self.encode(inputs).T)
+        flat_table, width = self.padded_table.ravel(), self.padded_table.shape[1]
+
+        states = np.full(codes.shape[1], self.initial, dtype=np.int32)
+        for step in codes:
+            states = np.take(flat_table, states * width + step)
+        return states
+
+
+    # Runs a whole batch of inputs in lockstep and returns their accept flags
+    def run_lockstep(self, inputs: Iterable[Iterable[str]]) -> np.ndarray:
+        return self.accepting[self.final_states(inputs)]
+
+
+# Bitset form of a NFA, built once from its interned form (see automata/interned.py)
+# A set of simultaneous states is an integer, with bit i set for state i
+class CompiledNFA:
+
+    # Precomputes the EPSILON closures and the successor masks
+    def __init__(self, interned: InternedAutomaton):
+        # Share the interning tables
+        self.states, self.state_ids = interned.states.names, interned.states.ids
+        self.symbols = interned.symbols.names
+
+        # Mask of every accepting state
+        self.accepting = 0
+        for state, accepting in enumerate(interned.accepting):
+            if accepting:
+                self.accepting |= 1 << state
+
+        # EPSILON closure of every state, found iteratively with a stack
+        # so that long chains of EPSILON transitions can't overflow anything
+        epsilon = interned.symbols.ids.get("EPSILON")
+        self.closures = []
+        for state in range(len(self.states)):
+            closure, stack = 1 << state, [state]
+            while stack and epsilon is not None:
+                for other_state in interned.successors(stack.pop(), epsilon):
+                    bit = 1 << other_state
+                    if not closure & bit:
+                        closure |= bit
+                        stack.append(other_state)
+            self.closures.append(closure)
+
+        self.initial = self.closures[interned.initial]
+
+        # For every symbol, the mask of states that have a rule for it (and are left
+        # when it is read), along with the closed successor mask of each such state
+        # States without a rule for the symbol are simply kept active
+        self.leaving = {symbol: 0 for symbol in self.symbols}
+        self.successors = {symbol: [0] * len(self.states) for symbol in self.symbols}
+        for state in range(len(self.states)):
+            for symbol_id, symbol in enumerate(self.symbols):
+                if interned.present[interned.index(state, symbol_id)]:
+                    self.leaving[symbol] |= 1 << state
+                    for next_state in interned.successors(state, symbol_id):
+                        self.successors[symbol][state] |= self.closures[next_state]
+
+
+    # Returns the set of states reached from a set of states on a symbol
+    def step(self, mask: int, symbol: str) -> int:
+        try:
+            leaving = self.leaving[symbol] & mask
+        except KeyError:
+            raise ValueError(f"Symbol {symbol} not recognized") from None
+
+        # Keep the states with nothing to do, then add the successors of the rest
+        mask ^= leaving
+        successors = self.successors[symbol]
+        while leaving:
+            low = leaving & -leaving
+            mask |= successors[low.bit_length() - 1]
+            leaving ^= low
+
+        return mask
+
+
+    # Runs a sequence of symbols from a given set of states and returns the final set
+    def run(self, symbols: Iterable[str], mask: int = None) -> int:
+        if mask is None:
+            mask = self.initial
+
+        for symbol in symbols:
+            mask = self.step(mask, symbol)
+
+        return mask
+
+
+    # Returns the names of the states in a set, in the order of the state list
+    def names(self, mask: int) -> list[str]:
+        return [state for index, state in enumerate(self.states) if mask >> index & 1]
+
+
+    # Classifies a batch of inputs, each of them being a sequence of symbols
+    # Returns the accept flags and the final sets of states
+    def run_many(self, inputs: Iterable[Iterable[str]]) -> tuple[list[bool], list[list[str]]]:
+        accepted, finals = [], []
+        for symbols in inputs:
+            mask = self.run(symbols)
+            accepted.append(mask & self.accepting != 0)
+            finals.append(self.names(mask))
+
+        return accepted, finals
@@ -0,0 +1,118 @@
+import numpy as np
+import random
+from automata.compiled import CompiledDFA
+
+# Counting the inputs of a given length a DFA accepts, and sampling them uniformly
+# Counts are exact Python integers (in NumPy object arrays), or taken modulo a given modulus,
+# in which case plain 64 bit integers are used whenever they can't overflow
+
+# Returns the dtype counts are computed with: 64 bit integers when counting modulo modulus,
+# if the largest intermediate value fits in them, Python integers otherwise
+def count_dtype(modulus: int | None, largest: int | None) -> type:
+    return np.int64 if modulus is not None and largest < 1 << 63 else object
+
+
+# Returns the count matrix of a DFA: entry (i, j) is the number of symbols leading from state i
+# to state j, missing rules being self-loops as in DFA.action
+# It is a plain list of lists, as used by matrices/matrix.py
+def count_matrix(dfa: CompiledDFA) -> list[list[int]]:
+    matrix = np.zeros((len(dfa.states), len(dfa.states)), dtype=np.int64)
+    np.add.at(matrix, (np.repeat(np.arange(len(dfa.states)), len(dfa.symbols)), dfa.table.ravel()), 1)
+    return matrix.tolist()
+
+
+# Returns the product of two square matrices, modulo modulus if one is given
+def matrix_product(A: np.ndarray, B: np.ndarray, modulus: int = None) -> np.ndarray:
+    product = A @ B
+    return product if modulus is None else product % modulus
+
+
+# Returns a square matrix to the power n, by exponentiation by squaring, modulo modulus if one is given
+def matrix_power(M, n: int, modulus: int = None) -> np.ndarray:
+    M = np.array(M, dtype=object)
+    if modulus is not None:
+        M %= modulus
+    # Products of two entries, summed over a row, have to fit in 64 bits
+    dtype = count_dtype(modulus, None if modulus is None else (modulus - 1) ** 2 * len(M))
+    M = M.astype(dtype)
+
+    result = np.identity(len(M), dtype=dtype)
+    if modulus is not None:
+        result %= modulus
+    while n > 0:
+        if n & 1:
+            result = matrix_product(result, M, modulus)
+        n >>= 1
+        if n > 0:
+            M = matrix_product(M, M, modulus)
+    return result
+
+
+# Returns the number of paths of length n from a state to any accepting state in a count matrix
+# (as built by count_matrix, or loaded with matrices/matrix.py), modulo modulus if one is given
+# States are given by their index in the matrix
+def count_paths(M, initial: int, accepting: list[int], n: int, modulus: int = None) -> int:
+    row = matrix_power(M, n, modulus)[initial]
+    count = sum(int(row[state]) for state in accepting)
+    return count if modulus is None else count % modulus
+
+
+# Returns the suffix count tables of a DFA, up to length n: table k holds, for every state, the
+# number of inputs of length k accepted from it, modulo modulus if one is given
+# Each table is built from the previous one by summing it over the transitions of every state
+def suffix_counts(dfa: CompiledDFA, n: int, modulus: int = None) -> list[np.ndarray]:
+    dtype = count_dtype(modulus, None if modulus is None else modulus * max(len(dfa.symbols), 1))
+    tables = [dfa.accepting.astype(np.int64).astype(dtype)]
+    for _ in range(n):
+        table = tables[-1][dfa.table].sum(axis=1, dtype=dtype)
+        tables.append(table if modulus is None else table % modulus)
+    return tables
+
+
+# Returns the number of inputs of length n a DFA accepts, modulo modulus if one is given
+# Long inputs go through exponentiation by squaring of the count matrix, in time logarithmic
+# in n, short ones through the suffix count tables, which avoid cubic matrix products
+def count_accepted(dfa: CompiledDFA, n: int, modulus: int = None) -> int:
+    states = len(dfa.states)
+    if n * len(dfa.symbols) <= 2 * states * states * n.bit_length():
+        # Only the last table is needed, so the previous ones are dropped as it goes
+        dtype = count_dtype(modulus, None if modulus is None else modulus * max(len(dfa.symbols), 1))
+        table = dfa.accepting.astype(np.int64).astype(dtype)
+        for _ in range(n):
+            table = table[dfa.table].sum(axis=1, dtype=dtype)
+            if modulus is not None:
+                table %= modulus
+        return int(table[dfa.initial])
+
+    accepting = np.flatnonzero(dfa.accepting).tolist()
+    return count_paths(count_matrix(dfa), dfa.initial, accepting, n, modulus)
+
+
+# Returns count inputs of length n drawn uniformly (and independently) among the ones a DFA
+# accepts, as lists of symbols, using the suffix count tables: at every position, a symbol is
+# picked with a probability proportional to the number of accepted endings after it
+# Raises a ValueError if no input of length n is accepted
+def sample_accepted(dfa: CompiledDFA, n: int, count: int = 1, rng: random.Random = None) -> list[list[str]]:
+    if rng is None:
+        rng = random.Random()
+    tables = suffix_counts(dfa, n)
+    if tables[n][dfa.initial] == 0:
+        raise ValueError(f"No input of length {n} is accepted")
+
+    transitions = dfa.table.tolist()
+    tables = [table.tolist() for table in tables]
+    samples = []
+    for _ in range(count):
+        state, symbols = dfa.initial, []
+        for remaining in range(n, 0, -1):
+            # Pick the symbol whose slice of the accepted endings holds a uniform draw
+            draw = rng.randrange(tables[remaining][state])
+            for symbol, next_state in enumerate(transitions[state]):
+                draw -= tables[remaining - 1][next_state]
+                if draw < 0:
+                    break
+            symbols.append(dfa.symbols[symbol])
+            state = next_state
+        samples.append(symbols)
+
+    return samples
@@ -0,0 +1,149 @@
+from automata.basicautomaton import BasicAutomaton
+from automata.compiled import CompiledNFA
+from automata.dfa import DFA
+from automata.languages import joined_name
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import override
+
+# Returns the DFA state name used for a set of NFA states, e.g. "{a,b}"
+# Names are escaped by joined_name, so different sets always get different names
+def subset_name(nfa: CompiledNFA, mask: int) -> str:
+    return joined_name(nfa.names(mask), "{", "}")
+
+
+# Subset construction, turns a compiled NFA into an equivalent DFA
+# Only subsets reachable from the initial one become states, and every symbol
+# of the NFA (EPSILON included, as NFA.action accepts it too) gets a rule,
+# unless only some of them are given in symbols
+# Raises a ValueError if more than max_states subsets would be needed
+def determinize(nfa: CompiledNFA, max_states: int = None, symbols: list[str] = None) -> DFA:
+    if symbols is None:
+        symbols = nfa.symbols
+
+    # Subsets in discovery order, and their transitions
+    order, rules = [nfa.initial], dict()
+    seen = {nfa.initial}
+
+    # Breadth-first search through the reachable subsets
+    for mask in order:
+        rules[mask] = dict()
+        for symbol in symbols:
+            next_mask = nfa.step(mask, symbol)
+            rules[mask][symbol] = next_mask
+            if next_mask not in seen:
+                seen.add(next_mask)
+                order.append(next_mask)
+                if max_states is not None and len(order) > max_states:
+                    raise ValueError(f"Subset construction needs more than {max_states} states")
+
+    # Name the subsets and fill in the DFA's data, in the usual schema
+    names = {mask: subset_name(nfa, mask) for mask in order}
+    dfa = DFA()
+    dfa.data = {
+        "states": [names[mask] for mask in order],
+        "accepting": [names[mask] for mask in order if mask & nfa.accepting],
+        "initial": names[nfa.initial],
+        "symbols": list(symbols),
+        "ruleset": {names[mask]: {symbol: names[next_mask] for symbol, next_mask in action.items()}
+                    for mask, action in rules.items()}
+    }
+    dfa.starting_state()
+
+    return dfa
+
+
+# A DFA for a NFA's subset construction, whose states are only materialised when
+# first visited, then kept in a bounded cache with least-recently-used eviction
+# Its state is a bitmask of NFA states, see CompiledNFA
+class LazyDFA(BasicAutomaton):
+
+    # Wraps a compiled NFA, keeping at most capacity subsets in the cache
+    def __init__(self, nfa: CompiledNFA, capacity: int = 1024):
+        super().__init__()
+        self.nfa = nfa
+        self.capacity = capacity
+
+        # Cached subsets, each with the transitions computed for it so far
+        self.cache = OrderedDict()
+        # Cache statistics, counted per transition lookup
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+        self.starting_state()
+
+
+    # Puts the lazy DFA in the initial subset
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def starting_state(self) -> None:
+        self.mask = self.nfa.initial
+
+
+    # Returns True if any NFA state in the current subset is accepting
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def accepting(self) -> bool:
+        return self.mask & self.nfa.accepting != 0
+
+
+    # The current subset, as a list of NFA state names
+    @property
+    def state(self) -> list[str]:
+        return self.nfa.names(self.mask)
+
+
+    # Returns the subset reached from a subset on a symbol, computing it on a miss
+    def transition(self, mask: int, symbol: str) -> int:
+        action = self.cache.get(mask)
+
+        if action is None:
+            # Materialise the subset, evicting the least recently used one if full
+            action = self.cache[mask] = dict()
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.cache.move_to_end(mask)
+
+        next_mask = action.get(symbol)
+        if next_mask is None:
+            self.misses += 1
+            next_mask = action[symbol] = self.nfa.step(mask, symbol)
+        else:
+            self.hits += 1
+
+        return next_mask
+
+
+    # Changes the current subset based on the input symbol
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def action(self, symbol: str) -> None:
+        self.mask = self.transition(self.mask, symbol)
+
+
+    # Classifies a batch of inputs (sequences of symbols), each run from the initial subset
+    # Returns the accept flags and the final lists of states
+    def run_many(self, inputs: Iterable[Iterable[str]]) -> tuple[list[bool], list[list[str]]]:
+        accepted, finals = [], []
+        for symbols in inputs:
+            mask = self.nfa.initial
+            for symbol in symbols:
+                mask = self.transition(mask, symbol)
+            accepted.append(mask & self.nfa.accepting != 0)
+            finals.append(self.nfa.names(mask))
+
+        return accepted, finals
+
+
+    # Returns the cache statistics
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "states": len(self.cache),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups > 0 else 0.0
+        }
@@ -1,33 +1,60 @@
 from automata.basicautomaton import BasicAutomaton
-from automata.checks.typecheck import assert_dictionary_types, DFA_TYPES
-from automata.checks.valuecheck import DFA_VALIDATORS
+from automata.checks.validator import validate
+from automata.compiled import CompiledDFA
+from automata.counting import count_accepted, count_matrix, sample_accepted
+from automata.languages import complement_data, counterexample, hopcroft_karp, product_data
+from automata.minimize import minimized_data
+from automata.scanner import DFAScanner
+from collections.abc import Iterable
+from matrices.matrix import save_matrix
+import numpy as np
+import random
 from typing import override
 
 class DFA(BasicAutomaton):
 
+    # Kind of automaton in the binary format
+    kind = "DFA"
+
+    # Integer transition table, built on demand by compile()
+    compiled = None
+
+    # Nothing to do before validating a DFA
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def preprocess(self) -> None:
+        pass
+
+
+    # Drops the interned form and the table compiled from it
+    @override
+    def invalidate(self) -> None:
+        super().invalidate()
+        self.compiled = None
+
+
     # Validates the DFA
     # Implements an abstract method from BasicAutomaton
     @override
     def validate_automata(self) -> None:
-        # Perform a type check first
-        assert_dictionary_types(self.data, DFA_TYPES)
-        # Then perform a list of value-checking functions
-        for check in DFA_VALIDATORS:
-            check(self.data)
+        # Check types and values in a single pass, reporting every error found
+        validate(self.kind, self.data)
 
 
     # Puts the DFA in its starting state
     # Implements an abstract method from BasicAutomaton
     @override
     def starting_state(self) -> None:
-        self.state = self.data["initial"]
+        interned = self.interned or self.intern()
+        self.state = interned.states.names[interned.initial]
         
 
     # Returns True if the automata is in an accepting state
     # Implements an abstract method from BasicAutomaton
     @override
     def accepting(self) -> bool:
-        return self.state in self.data["accepting"]
+        interned = self.interned or self.intern()
+        return interned.accepting[interned.states.ids[self.state]] == 1
     
 
     # Changes the state of the automata based on the input symbol
@@ -35,12 +62,168 @@ class DFA(BasicAutomaton):
     # Implements an abstract method from BasicAutomaton
     @override
     def action(self, symbol: str) -> None:
+        interned = self.interned or self.intern()
         # Validate the received symbol
-        if symbol not in self.data["symbols"]:
+        symbol_id = interned.symbols.ids.get(symbol)
+        if symbol_id is None:
             raise ValueError(f"Symbol {symbol} not recognized")
 
         # If the transition function has an entry for (self.state, symbol) -> new_state
-        if symbol in self.data["ruleset"][self.state].keys():
+        next_state = interned.table[interned.index(interned.states.ids[self.state], symbol_id)]
+        if next_state != -1:
             # Perform the state change
-            self.state = self.data["ruleset"][self.state][symbol]
-        
+            self.state = interned.states.names[next_state]
+
+
+    # Performs a sequence of actions on state ids, only naming the final state
+    # Returns the final state of the automaton (accepting or not)
+    @override
+    def action_sequence(self, symbols: list[str]) -> bool:
+        interned = self.interned or self.intern()
+        table, symbol_ids, count = interned.table, interned.symbols.ids, len(interned.symbols)
+        state = interned.states.ids[self.state]
+
+        for symbol in symbols:
+            symbol_id = symbol_ids.get(symbol)
+            if symbol_id is None:
+                self.state = interned.states.names[state]
+                raise ValueError(f"Symbol {symbol} not recognized")
+            next_state = table[state * count + symbol_id]
+            if next_state != -1:
+                state = next_state
+
+        self.state = interned.states.names[state]
+        return interned.accepting[state] == 1
+
+
+    # Builds the integer transition table from the interned states and symbols
+    # The table is dropped by invalidate(), and built again when needed
+    def compile(self) -> CompiledDFA:
+        self.compiled = CompiledDFA(self.interned or self.intern())
+        return self.compiled
+
+
+    # Classifies a batch of inputs (sequences of symbols) using the compiled table
+    # Each input is run from the initial state, the DFA's own state is left untouched
+    # Returns the accept flags and the final states
+    def run_many(self, inputs: Iterable[Iterable[str]]) -> tuple[list[bool], list[str]]:
+        if self.compiled is None:
+            self.compile()
+        return self.compiled.run_many(inputs)
+
+
+    # Classifies a batch of inputs by running all of them in lockstep, as a
+    # vector of states advanced through the compiled table at each time step
+    # Inputs may have different lengths, and a boolean accept vector is returned
+    def run_lockstep(self, inputs: Iterable[Iterable[str]]) -> np.ndarray:
+        if self.compiled is None:
+            self.compile()
+        return self.compiled.run_lockstep(inputs)
+
+
+    # Returns the minimal DFA accepting the same language, by dropping the
+    # unreachable states and merging the equivalent ones (Hopcroft's algorithm)
+    def minimize(self) -> "DFA":
+        if self.compiled is None:
+            self.compile()
+
+        minimal = DFA()
+        minimal.data = minimized_data(self.compiled)
+        minimal.starting_state()
+        return minimal
+
+
+    # Returns a DFA from data in the usual schema, put in its starting state
+    @staticmethod
+    def from_data(data: dict) -> "DFA":
+        dfa = DFA()
+        dfa.data = data
+        dfa.starting_state()
+        return dfa
+
+
+    # Returns the product of the DFA with another one sharing its alphabet, over their reachable
+    # pairs of states, accepting when combine(this one accepts, the other one accepts) is True
+    def product(self, other: "DFA", combine) -> "DFA":
+        if self.compiled is None:
+            self.compile()
+        if other.compiled is None:
+            other.compile()
+        return DFA.from_data(product_data(self.compiled, other.compiled, combine))
+
+
+    # Returns a DFA accepting the inputs both DFAs accept
+    def intersection(self, other: "DFA") -> "DFA":
+        return self.product(other, lambda first, second: first and second)
+
+
+    # Returns a DFA accepting the inputs either DFA accepts
+    def union(self, other: "DFA") -> "DFA":
+        return self.product(other, lambda first, second: first or second)
+
+
+    # Returns a DFA accepting the inputs this DFA accepts and the other one rejects
+    def difference(self, other: "DFA") -> "DFA":
+        return self.product(other, lambda first, second: first and not second)
+
+
+    # Returns a DFA accepting the inputs this DFA rejects, over the same alphabet
+    def complement(self) -> "DFA":
+        return DFA.from_data(complement_data(self.data))
+
+
+    # Returns True if both DFAs accept the same language (Hopcroft and Karp's algorithm)
+    def equivalent(self, other: "DFA") -> bool:
+        if self.compiled is None:
+            self.compile()
+        if other.compiled is None:
+            other.compile()
+        return hopcroft_karp(self.compiled, other.compiled)
+
+
+    # Returns a shortest input (as a list of symbols) accepted by only one of the DFAs,
+    # or None if they accept the same language
+    def counterexample(self, other: "DFA") -> list[str] | None:
+        if self.equivalent(other):
+            return None
+        return counterexample(self.compiled, other.compiled)
+
+
+    # Returns the count matrix of the DFA: entry (i, j) is the number of symbols leading from
+    # the i-th state to the j-th one (see automata/counting.py)
+    def count_matrix(self) -> list[list[int]]:
+        if self.compiled is None:
+            self.compile()
+        return count_matrix(self.compiled)
+
+
+    # Saves the count matrix in the format of matrices/matrix.py, for count_paths() to load back
+    def save_count_matrix(self, filename: str) -> None:
+        save_matrix(self.count_matrix(), filename)
+
+
+    # Returns the number of inputs of length n the DFA accepts, exactly or modulo modulus
+    def count_accepted(self, n: int, modulus: int = None) -> int:
+        if self.compiled is None:
+            self.compile()
+        return count_accepted(self.compiled, n, modulus)
+
+
+    # Returns count inputs of length n (lists of symbols), drawn uniformly among the accepted ones
+    def sample_accepted(self, n: int, count: int = 1, rng: random.Random = None) -> list[list[str]]:
+        if self.compiled is None:
+            self.compile()
+        return sample_accepted(self.compiled, n, count, rng)
+
+
+    # Returns a scanner running byte inputs through the DFA chunk by chunk (see automata/scanner.py)
+    # mapping gives the symbol read from every byte, and defaults to the single-character symbols
+    def scanner(self, mapping: dict[int | str | bytes, str] = None) -> DFAScanner:
+        return DFAScanner(self.interned or self.intern(), mapping)
+
+
+    # Scans a whole byte input (bytes-like object, mmap, binary file object or filename)
+    # from the initial state, leaving the DFA's own state untouched
+    # Returns whether the input is accepted, or with report set, the lengths of all its accepted prefixes
+    def scan(self, source, mapping: dict[int | str | bytes, str] = None, report: bool = False) -> bool | list[int]:
+        return self.scanner(mapping).scan(source, report)
@@ -0,0 +1,176 @@
+from array import array
+from automata.turing import TM
+from typing import override
+
+# A Turing machine with the same behavior as TM, but with its ruleset compiled
+# into a table indexed by (state id, symbol id), and its tape stored as a growable
+# array of symbol ids, with an offset so that negative positions can be reached
+class FastTM(TM):
+
+    # Tapes start out with this many cells, and are doubled when the head leaves them
+    INITIAL_TAPE = 64
+    # Compiled ruleset, built by compile() when the machine is first put in its starting state
+    table = None
+
+    # Drops the interned form and the table compiled from it
+    @override
+    def invalidate(self) -> None:
+        super().invalidate()
+        self.table = None
+
+
+    # Interns states and symbols and compiles the ruleset
+    # Called again whenever the table was dropped by invalidate()
+    def compile(self) -> None:
+        interned = self.interned or self.intern()
+        self.states = interned.states.names
+        self.state_ids = interned.states.ids
+        self.symbols = interned.symbols.names
+        self.symbol_ids = interned.symbols.ids
+        self.initial = interned.initial
+        self.blank = self.symbol_ids[interned.blank]
+
+        # Up to 256 symbols fit in a bytearray, any more need a wider array
+        self.cell_type = "B" if len(self.symbols) <= 256 else "I"
+
+        # The table has an entry for every (state, symbol), None meaning no rule
+        # Entries are (new state id, new symbol id, head delta) tuples, for the first matching rule
+        self.table = [None if next_state == -1 else (next_state, symbol, delta)
+                      for next_state, symbol, delta in zip(interned.table, interned.writes, interned.shifts)]
+
+
+    # Returns a tape of blank cells
+    def blank_tape(self, length: int) -> bytearray | array:
+        if self.cell_type == "B":
+            return bytearray([self.blank]) * length
+        return array(self.cell_type, [self.blank]) * length
+
+
+    # Puts the TM in its starting state, resetting the tape
+    # The ruleset is only compiled the first time, so resets keep the table (and MacroTM's macros)
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def starting_state(self) -> None:
+        if self.table is None:
+            self.compile()
+
+        # Default tape symbol is a BLANK, and cell i of the tape holds position i - offset
+        self.cells = self.blank_tape(self.INITIAL_TAPE)
+        self.offset = self.INITIAL_TAPE // 2
+        # Start at the leftmost end of the tape
+        self.tape_pointer = 0
+        # Start in the initial state
+        self.state_id = self.initial
+        # The machine isn't halted at first, and isn't strict by default, see TM
+        self.halted = False
+        self.strict = False
+
+
+    # The current state's name
+    @property
+    def state(self) -> str:
+        return self.states[self.state_id]
+
+
+    @state.setter
+    def state(self, name: str) -> None:
+        self.state_id = self.state_ids[name]
+
+
+    # Grows the tape so that it contains a position, doubling its length
+    def grow(self, position: int) -> None:
+        while not 0 <= position + self.offset < len(self.cells):
+            extra = self.blank_tape(len(self.cells))
+            if position + self.offset < 0:
+                self.cells = extra + self.cells
+                self.offset += len(extra)
+            else:
+                self.cells = self.cells + extra
+
+
+    # Changes the states of the automata based on the input and tape
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def action(self) -> None:
+        self.run(1)
+
+
+    # Runs the Turing machine until it halts, for at most max_steps steps
+    # Counts steps like TM.run, and returns the step count and whether it halted
+    @override
+    def run(self, max_steps: int) -> tuple[int, bool]:
+        if self.halted:
+            return 0, True
+        if self.table is None:
+            self.compile()
+
+        # Work on local variables, writing them back at the end
+        table, width, strict = self.table, len(self.symbols), self.strict
+        cells, offset = self.cells, self.offset
+        state, pointer = self.state_id, self.tape_pointer
+
+        steps, size = 0, len(cells)
+        while steps < max_steps:
+            index = pointer + offset
+            if not 0 <= index < size:
+                self.grow(pointer)
+                cells, offset, size = self.cells, self.offset, len(self.cells)
+                index = pointer + offset
+
+            steps += 1
+            rule = table[state * width + cells[index]]
+
+            # If we didn't find any rule match, halt
+            if rule is None:
+                self.halted = True
+                break
+
+            state, cells[index], delta = rule
+            pointer += delta
+
+            # Halt when going out-of-bounds
+            if strict and pointer < 0:
+                self.halted = True
+                break
+
+        self.state_id, self.tape_pointer = state, pointer
+        return steps, self.halted
+
+
+    # Returns the machine's exact configuration, see TM.configuration
+    # The tape part holds symbol ids instead of symbols
+    @override
+    def configuration(self) -> tuple:
+        written = [index for index, symbol in enumerate(self.cells) if symbol != self.blank]
+        if not written:
+            return self.state, self.tape_pointer, 0, ()
+
+        first, last = written[0], written[-1]
+        return self.state, self.tape_pointer, first - self.offset, tuple(self.cells[first:last + 1])
+
+
+    # Returns the current tape between two values
+    @override
+    def get_tape(self, front: int, back: int) -> list[str]:
+        self.grow(front)
+        self.grow(back)
+        return [self.symbols[symbol] for symbol in self.cells[front + self.offset:back + self.offset + 1]]
+
+
+    # Gives the Turing machine a new tape and optionally sets the head's position
+    @override
+    def set_tape(self, tape: list[str], position: int = 0) -> None:
+        # Check the input first
+        for symbol in tape:
+            # If any of the symbols we try to set aren't recognized, throw an exception
+            if symbol not in self.symbol_ids:
+                raise ValueError(f"Symbol {symbol} was given to be placed on the tape but is not recognized")
+
+        # Clear the old tape, and write the new tape contents
+        self.cells = self.blank_tape(max(self.INITIAL_TAPE, 2 * len(tape)))
+        self.offset = 0
+        for pointer, value in enumerate(tape):
+            self.cells[pointer] = self.symbol_ids[value]
+
+        # Set the head's new position
+        self.tape_pointer = position
@@ -0,0 +1,166 @@
+import sys
+from array import array
+from collections.abc import Iterable
+
+# Interning table, giving every distinct name an integer id, in order of appearance
+class Names:
+    __slots__ = ("names", "ids")
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names = []
+        self.ids = dict()
+        for name in names:
+            self.add(name)
+
+
+    # Returns the id of a name, giving it a new one if it hasn't got one yet
+    def add(self, name: str) -> int:
+        index = self.ids.get(name)
+        if index is None:
+            index = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+# Compact form of a DFA, NFA or TM definition, shared by the three of them
+# States and symbols are interned into ids, and the rules are kept in flat arrays
+# indexed by state id * symbol count + symbol id, so names are only looked up
+# when they go in or out of the automaton
+# DFA: table holds the next state, or -1 without a rule
+# NFA: present flags the (state, symbol) pairs with a rule, whose next states are
+#      targets[offsets[index]:offsets[index + 1]]
+# TM: table holds the new state of the first matching rule (or -1), writes the symbol
+#     it writes, and shifts the head's movement
+class InternedAutomaton:
+    __slots__ = ("kind", "states", "symbols", "initial", "accepting", "table",
+                 "present", "offsets", "targets", "writes", "shifts", "blank", "increment", "decrement")
+
+    # Interns a validated definition of the given kind ("DFA", "NFA" or "TM")
+    # Without a definition, the form is left empty, for loaders filling it in from ids
+    # they already have (see automata/binary.py)
+    def __init__(self, kind: str, data: dict = None):
+        self.kind = kind
+        self.states = self.symbols = self.initial = self.accepting = self.table = None
+        self.present = self.offsets = self.targets = self.writes = self.shifts = None
+        self.blank = self.increment = self.decrement = None
+        if data is None:
+            return
+
+        self.states = Names(data["states"])
+        self.symbols = Names(data["symbols"])
+        self.initial = self.states.ids[data["initial"]]
+        self.accepting = bytearray(len(self.states))
+        for state in data["accepting"]:
+            self.accepting[self.states.ids[state]] = 1
+
+        size = len(self.states) * len(self.symbols)
+
+        if kind == "DFA":
+            self.table = array("i", [-1]) * size
+            for state, action in data["ruleset"].items():
+                for symbol, next_state in action.items():
+                    self.table[self.index(self.states.ids[state], self.symbols.ids[symbol])] = self.states.ids[next_state]
+
+        elif kind == "NFA":
+            self.table = None
+            self.present = bytearray(size)
+            # Next states of every pair, gathered in index order before being flattened
+            successors = dict()
+            for state, action in data["ruleset"].items():
+                for symbol, next_states in action.items():
+                    index = self.index(self.states.ids[state], self.symbols.ids[symbol])
+                    self.present[index] = 1
+                    successors[index] = [self.states.ids[next_state] for next_state in next_states]
+
+            self.offsets, self.targets = array("i", [0]) * (size + 1), array("i")
+            for index in range(size):
+                self.targets.extend(successors.get(index, ()))
+                self.offsets[index + 1] = len(self.targets)
+
+        else:
+            self.blank, self.increment, self.decrement = data["blank"], data["increment"], data["decrement"]
+            self.table, self.writes, self.shifts = array("i", [-1]) * size, array("i", [0]) * size, array("b", [0]) * size
+            for rule in data["ruleset"]:
+                index = self.index(self.states.ids[rule["old_state"]], self.symbols.ids[rule["old_tape"]])
+                # If several rules match, the first one is used
+                if self.table[index] == -1:
+                    self.table[index] = self.states.ids[rule["new_state"]]
+                    self.writes[index] = self.symbols.ids[rule["new_tape"]]
+                    if rule["shift"] == self.increment:
+                        self.shifts[index] = 1
+                    elif rule["shift"] == self.decrement:
+                        self.shifts[index] = -1
+
+
+    # Returns the index of a (state id, symbol id) pair in the rule arrays
+    def index(self, state: int, symbol: int) -> int:
+        return state * len(self.symbols) + symbol
+
+
+    # Returns the next state ids of a NFA for a (state id, symbol id) pair
+    def successors(self, state: int, symbol: int) -> array:
+        index = self.index(state, symbol)
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+
+    # Builds a definition in the usual format back from the compact form
+    # Rules are grouped by state in state order, and states without rules get no entry
+    def to_data(self) -> dict:
+        states, symbols = self.states.names, self.symbols.names
+        data = {
+            "states": list(states),
+            "accepting": [state for index, state in enumerate(states) if self.accepting[index]],
+            "initial": states[self.initial],
+            "symbols": list(symbols)
+        }
+
+        if self.kind == "TM":
+            data.update({"blank": self.blank, "increment": self.increment, "decrement": self.decrement, "ruleset": []})
+            shift_names = {1: self.increment, -1: self.decrement}
+            for state_id, state in enumerate(states):
+                for symbol_id, symbol in enumerate(symbols):
+                    index = self.index(state_id, symbol_id)
+                    if self.table[index] != -1:
+                        data["ruleset"].append({
+                            "old_state": state, "old_tape": symbol,
+                            "new_state": states[self.table[index]], "new_tape": symbols[self.writes[index]],
+                            "shift": shift_names[self.shifts[index]]
+                        })
+            return data
+
+        data["ruleset"] = dict()
+        for state_id, state in enumerate(states):
+            action = dict()
+            for symbol_id, symbol in enumerate(symbols):
+                index = self.index(state_id, symbol_id)
+                if self.kind == "DFA" and self.table[index] != -1:
+                    action[symbol] = states[self.table[index]]
+                elif self.kind == "NFA" and self.present[index]:
+                    action[symbol] = [states[next_state] for next_state in self.successors(state_id, symbol_id)]
+            if action:
+                data["ruleset"][state] = action
+        return data
+
+
+# Returns the memory used by an object and everything it refers to, in bytes
+# Objects referred to several times (like interned strings) are only counted once
+def deep_size(root) -> int:
+    seen, stack, size = set(), [root], 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack += list(current.keys()) + list(current.values())
+        elif isinstance(current, (list, tuple, set)):
+            stack += list(current)
+        elif hasattr(type(current), "__slots__"):
+            stack += [getattr(current, slot) for slot in type(current).__slots__ if hasattr(current, slot)]
+    return size
@@ -0,0 +1,128 @@
+from automata.compiled import CompiledDFA
+from collections.abc import Callable
+
+# Language operations on DFAs, working on their compiled tables, where a missing rule
+# is a self-loop, as in DFA.action
+# Both DFAs of an operation have to share the same alphabet, in any order
+
+# Returns the name of a combined state, made of the names of several states, as in "(a,b)"
+# Backslashes and commas in the names are escaped with a backslash, so different lists of
+# names always give different names
+def joined_name(names: list[str], opening: str, closing: str) -> str:
+    return opening + ",".join(name.replace("\\", "\\\\").replace(",", "\\,") for name in names) + closing
+
+
+# Returns the columns of a second DFA's table in the symbol order of the first one
+# Raises a ValueError if their alphabets differ
+def aligned_table(first: CompiledDFA, second: CompiledDFA) -> list[list[int]]:
+    if set(first.symbols) != set(second.symbols):
+        raise ValueError("The DFAs don't share the same alphabet")
+    order = [second.symbol_ids[symbol] for symbol in first.symbols]
+    return [[row[symbol] for symbol in order] for row in second.table.tolist()]
+
+
+# Returns the data of the product of two DFAs, over the pairs of states reachable from the
+# initial pair, with a pair accepting when combine(first accepts, second accepts) is True
+# Pairs are named "(first state,second state)", escaped by joined_name, and self-loops
+# are left out of the ruleset
+def product_data(first: CompiledDFA, second: CompiledDFA, combine: Callable[[bool, bool], bool]) -> dict:
+    first_table, second_table = first.table.tolist(), aligned_table(first, second)
+
+    initial = (first.initial, second.initial)
+    order, ids = [initial], {initial: 0}
+    rules = []
+    # Breadth-first search through the reachable pairs
+    for left, right in order:
+        action = []
+        for next_pair in zip(first_table[left], second_table[right]):
+            if next_pair not in ids:
+                ids[next_pair] = len(order)
+                order.append(next_pair)
+            action.append(ids[next_pair])
+        rules.append(action)
+
+    names = [joined_name([first.states[left], second.states[right]], "(", ")") for left, right in order]
+    return {
+        "states": names,
+        "accepting": [names[index] for index, (left, right) in enumerate(order)
+                      if combine(bool(first.accepting[left]), bool(second.accepting[right]))],
+        "initial": names[0],
+        "symbols": list(first.symbols),
+        "ruleset": {names[index]: {symbol: names[next_index] for symbol, next_index in zip(first.symbols, action)
+                                   if next_index != index}
+                    for index, action in enumerate(rules)}
+    }
+
+
+# Returns the data of a DFA accepting exactly the inputs a DFA rejects
+# Missing rules stay self-loops, so only the accepting states change
+def complement_data(data: dict) -> dict:
+    accepting = set(data["accepting"])
+    return {
+        "states": list(data["states"]),
+        "accepting": [state for state in data["states"] if state not in accepting],
+        "initial": data["initial"],
+        "symbols": list(data["symbols"]),
+        "ruleset": {state: dict(action) for state, action in data["ruleset"].items()}
+    }
+
+
+# Hopcroft and Karp's equivalence check: the two initial states are merged, and every pair
+# of states merged implies their successors on every symbol are merged too, with a union-find
+# over the states of both DFAs (the second's ids shifted past the first's)
+# Runs in near-linear time in the number of states times the alphabet's size
+# Returns True if the DFAs accept the same language
+def hopcroft_karp(first: CompiledDFA, second: CompiledDFA) -> bool:
+    offset = len(first.states)
+    table = first.table.tolist() + [[state + offset for state in row] for row in aligned_table(first, second)]
+    accepting = first.accepting.tolist() + second.accepting.tolist()
+    parent = list(range(len(table)))
+
+    # Returns the representative of a state's class, halving the path to it along the way
+    def find(state: int) -> int:
+        while parent[state] != state:
+            parent[state] = parent[parent[state]]
+            state = parent[state]
+        return state
+
+    pending = [(first.initial, second.initial + offset)]
+    parent[pending[0][1]] = pending[0][0]
+    while pending:
+        left, right = pending.pop()
+        if accepting[left] != accepting[right]:
+            return False
+        for next_left, next_right in zip(table[left], table[right]):
+            root_left, root_right = find(next_left), find(next_right)
+            if root_left != root_right:
+                parent[root_right] = root_left
+                pending.append((next_left, next_right))
+
+    return True
+
+
+# Returns a shortest input accepted by exactly one of two DFAs, as a list of symbols,
+# or None if they accept the same language
+# The pairs of states are searched breadth-first, so the first pair found with only one
+# accepting state is reached through a shortest input
+def counterexample(first: CompiledDFA, second: CompiledDFA) -> list[str] | None:
+    first_table, second_table = first.table.tolist(), aligned_table(first, second)
+
+    initial = (first.initial, second.initial)
+    # Pair each pair was first reached from, and the symbol id it was reached on
+    previous = {initial: None}
+    order = [initial]
+    for pair in order:
+        left, right = pair
+        if first.accepting[left] != second.accepting[right]:
+            symbols = []
+            while previous[pair] is not None:
+                pair, symbol = previous[pair]
+                symbols.append(first.symbols[symbol])
+            return symbols[::-1]
+
+        for symbol, next_pair in enumerate(zip(first_table[left], second_table[right])):
+            if next_pair not in previous:
+                previous[next_pair] = (pair, symbol)
+                order.append(next_pair)
+
+    return None
@@ -0,0 +1,212 @@
+from automata.fastturing import FastTM
+from typing import override
+
+# Ways a macro step can end: leaving the block on either side, halting inside
+# it, running out of steps, or never leaving it at all
+LEFT, RIGHT, HALT, BUDGET, LOOP = "left", "right", "halt", "budget", "loop"
+
+# A Turing machine with the same behavior as TM and FastTM, simulated as a macro
+# machine: the tape is cut into blocks of block_size cells, stored run-length
+# encoded, and what the machine does inside a block is computed once and cached
+# When the machine sweeps across a run of identical blocks, leaving each of them
+# in the same state it entered, the whole run is crossed in a single transition
+# Only machines with up to 256 tape symbols are supported
+class MacroTM(FastTM):
+
+    # Constructor, can load from a .json file
+    def __init__(self, filename: str = None, block_size: int = 1):
+        self.block_size = block_size
+        super().__init__(filename)
+
+
+    # Interns states and symbols, compiles the ruleset, and resets the macro cache
+    @override
+    def compile(self) -> None:
+        super().compile()
+        if self.cell_type != "B":
+            raise ValueError("Macro simulation only supports up to 256 tape symbols")
+
+        # Cached macro steps, (state, head offset, block) -> (state, block, head offset, steps, end)
+        self.macros = dict()
+        # A block has this many different configurations, running longer means a loop
+        self.loop_limit = len(self.states) * self.block_size * len(self.symbols) ** self.block_size + 1
+
+
+    # Single steps are cheaper on the plain byte tape
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def action(self) -> None:
+        FastTM.run(self, 1)
+
+
+    # Runs the base machine inside a block, for at most limit steps
+    # Returns the final state, block and head offset, the steps taken and how it ended
+    def simulate(self, state: int, offset: int, block: bytes, limit: int) -> tuple:
+        table, width = self.table, len(self.symbols)
+        cells, steps = bytearray(block), 0
+
+        while steps < limit:
+            steps += 1
+            rule = table[state * width + cells[offset]]
+            if rule is None:
+                return state, bytes(cells), offset, steps, HALT
+
+            state, cells[offset], delta = rule
+            offset += delta
+            if offset < 0:
+                return state, bytes(cells), offset, steps, LEFT
+            if offset >= self.block_size:
+                return state, bytes(cells), offset, steps, RIGHT
+
+        return state, bytes(cells), offset, steps, BUDGET
+
+
+    # Returns the complete macro step for a configuration, computing it on a miss
+    def macro(self, state: int, offset: int, block: bytes) -> tuple:
+        key = (state, offset, block)
+        result = self.macros.get(key)
+        if result is None:
+            result = self.simulate(state, offset, block, self.loop_limit)
+            if result[4] == BUDGET:
+                result = (state, block, offset, 0, LOOP)
+            self.macros[key] = result
+        return result
+
+
+    # Converts the byte tape into runs of blocks around the head's block
+    # Returns the left and right run stacks (nearest run on top), the head's block and its position
+    def to_blocks(self) -> tuple[list, list, bytes, int]:
+        self.grow(self.tape_pointer)
+        k, cells = self.block_size, self.cells
+
+        # Pad the tape with blanks, so that every block starts at a multiple of k
+        first = -self.offset
+        start = first // k * k
+        cells = self.blank_tape(first - start) + cells
+        cells = cells + self.blank_tape(-len(cells) % k)
+
+        # Cut the tape into blocks
+        blocks = [bytes(cells[index:index + k]) for index in range(0, len(cells), k)]
+        base = self.tape_pointer // k * k
+        head = (base - start) // k
+
+        left, right = [], []
+        for block in blocks[:head]:
+            push(left, block, 1)
+        for block in reversed(blocks[head + 1:]):
+            push(right, block, 1)
+
+        return left, right, blocks[head], base
+
+
+    # Converts runs of blocks back into the byte tape
+    def from_blocks(self, left: list, right: list, block: bytes, base: int) -> None:
+        start = base - self.block_size * sum(count for _, count in left)
+        self.cells = bytearray(b"".join(run * count for run, count in left) + block +
+                               b"".join(run * count for run, count in reversed(right)))
+        self.offset = -start
+
+
+    # Runs the Turing machine until it halts, for at most max_steps steps
+    # Counts steps like TM.run, and returns the step count and whether it halted
+    @override
+    def run(self, max_steps: int) -> tuple[int, bool]:
+        if self.halted:
+            return 0, True
+        if self.table is None:
+            self.compile()
+
+        k, strict = self.block_size, self.strict
+        blank = bytes(self.blank_tape(k))
+        left, right, block, base = self.to_blocks()
+        state, offset = self.state_id, self.tape_pointer - base
+
+        steps = 0
+        while steps < max_steps:
+            # A strict machine halts on any step left of the tape's start,
+            # which is left to the plain simulation
+            if strict and base < 0:
+                break
+
+            old_state, old_offset, old_block = state, offset, block
+            state, block, offset, taken, end = self.macro(state, offset, block)
+
+            # Not enough steps left to finish the macro step, so do what fits
+            if end == LOOP or steps + taken > max_steps:
+                state, block, offset, taken, end = self.simulate(old_state, old_offset, old_block, max_steps - steps)
+                steps += taken
+                break
+
+            steps += taken
+            if end == HALT:
+                self.halted = True
+                break
+
+            if end == RIGHT:
+                push(left, block, 1)
+                # Sweep across a run of copies of the same block, if each of them
+                # would be entered and left the same way as this one
+                if state == old_state and old_offset == 0 and right and right[-1][0] == old_block:
+                    count = min(right[-1][1], (max_steps - steps) // taken)
+                    steps += count * taken
+                    push(left, block, count)
+                    pop(right, blank, count)
+                    base += count * k
+
+                block, offset = pop(right, blank, 1), 0
+                base += k
+
+            else:
+                push(right, block, 1)
+                # Moving left from the tape's start halts a strict machine
+                if strict and base == 0:
+                    block, offset = pop(left, blank, 1), k - 1
+                    base -= k
+                    self.halted = True
+                    break
+
+                # Same as above, without sweeping past the tape's start on strict machines
+                if state == old_state and old_offset == k - 1 and left and left[-1][0] == old_block:
+                    count = min(left[-1][1], (max_steps - steps) // taken)
+                    if strict:
+                        count = min(count, base // k - 1)
+                    steps += count * taken
+                    push(right, block, count)
+                    pop(left, blank, count)
+                    base -= count * k
+
+                block, offset = pop(left, blank, 1), k - 1
+                base -= k
+
+        self.from_blocks(left, right, block, base)
+        self.state_id, self.tape_pointer = state, base + offset
+
+        # Finish anything left to the plain simulation
+        if steps < max_steps and not self.halted:
+            taken, _ = super().run(max_steps - steps)
+            steps += taken
+
+        return steps, self.halted
+
+
+# Pushes count copies of a block onto a run stack, merging it with the top run
+def push(runs: list, block: bytes, count: int) -> None:
+    if count <= 0:
+        return
+    if runs and runs[-1][0] == block:
+        runs[-1][1] += count
+    else:
+        runs.append([block, count])
+
+
+# Takes count copies of the top block off a run stack, and returns that block
+# An empty stack stands for an infinite run of blank blocks
+def pop(runs: list, blank: bytes, count: int) -> bytes:
+    if not runs:
+        return blank
+
+    block = runs[-1][0]
+    runs[-1][1] -= count
+    if runs[-1][1] == 0:
+        runs.pop()
+    return block
@@ -0,0 +1,98 @@
+import json
+from automata.compiled import CompiledDFA
+from automata.interned import InternedAutomaton
+from collections import defaultdict
+
+# Returns the ids of the states reachable from the initial state, in discovery order
+def reachable_states(dfa: CompiledDFA) -> list[int]:
+    order, seen = [dfa.initial], {dfa.initial}
+    for state in order:
+        for next_state in dfa.table[state].tolist():
+            if next_state not in seen:
+                seen.add(next_state)
+                order.append(next_state)
+    return order
+
+
+# Hopcroft's partition refinement over a set of states closed under transitions
+# Returns the equivalence classes (blocks) as lists of state ids
+def hopcroft(dfa: CompiledDFA, states: list[int]) -> list[list[int]]:
+    # Inverse transition function, restricted to the given states
+    inverse = [defaultdict(list) for _ in dfa.symbols]
+    for state in states:
+        for symbol, next_state in enumerate(dfa.table[state].tolist()):
+            inverse[symbol][next_state].append(state)
+
+    # Start by splitting the accepting states from the rest
+    accepting = {state for state in states if dfa.accepting[state]}
+    blocks = [block for block in [accepting, set(states) - accepting] if block]
+    block_of = dict()
+    for index, block in enumerate(blocks):
+        for state in block:
+            block_of[state] = index
+
+    # Blocks waiting to be used as splitters; one of the two initial blocks is enough
+    waiting = {min(range(len(blocks)), key=lambda index: len(blocks[index]))}
+
+    while waiting:
+        splitter = list(blocks[waiting.pop()])
+        for symbol in range(len(dfa.symbols)):
+            # Group the states leading into the splitter on this symbol by their block
+            touched = defaultdict(set)
+            for state in splitter:
+                for previous in inverse[symbol].get(state, []):
+                    touched[block_of[previous]].add(previous)
+
+            # Split every block that is only partly leading into the splitter
+            for index, part in touched.items():
+                if len(part) == len(blocks[index]):
+                    continue
+
+                blocks[index] -= part
+                blocks.append(part)
+                new_index = len(blocks) - 1
+                for state in part:
+                    block_of[state] = new_index
+
+                # Both halves have to be splitters if the old block was one,
+                # otherwise it is enough to use the smaller of them
+                if index in waiting or len(part) <= len(blocks[index]):
+                    waiting.add(new_index)
+                else:
+                    waiting.add(index)
+
+    return [sorted(block) for block in blocks]
+
+
+# Builds the data of a minimal DFA accepting the same language as a compiled DFA
+# Every state is named after the first state of its block, in the original order
+# Rules that keep the state in place are left out, as that is the default behavior
+def minimized_data(dfa: CompiledDFA) -> dict:
+    blocks = sorted(hopcroft(dfa, reachable_states(dfa)))
+    block_of = {state: index for index, block in enumerate(blocks) for state in block}
+    names = [dfa.states[block[0]] for block in blocks]
+
+    ruleset = dict()
+    for index, block in enumerate(blocks):
+        ruleset[names[index]] = dict()
+        for symbol, next_state in zip(dfa.symbols, dfa.table[block[0]].tolist()):
+            if block_of[next_state] != index:
+                ruleset[names[index]][symbol] = names[block_of[next_state]]
+
+    return {
+        "states": names,
+        "accepting": [names[index] for index, block in enumerate(blocks) if dfa.accepting[block[0]]],
+        "initial": names[block_of[dfa.initial]],
+        "symbols": list(dfa.symbols),
+        "ruleset": ruleset
+    }
+
+
+# Returns the size of a DFA's data: states, rules, JSON and compiled table bytes
+def size_report(data: dict) -> dict:
+    return {
+        "states": len(data["states"]),
+        "rules": sum(len(action) for action in data["ruleset"].values()),
+        "json_bytes": len(json.dumps(data, indent=4)),
+        "table_bytes": CompiledDFA(InternedAutomaton("DFA", data)).table.nbytes
+    }
@@ -1,11 +1,19 @@
-from copy import deepcopy
 from automata.basicautomaton import BasicAutomaton
-from automata.checks.typecheck import assert_dictionary_types, NFA_TYPES
-from automata.checks.valuecheck import NFA_VALIDATORS
+from automata.checks.validator import validate
+from automata.compiled import CompiledNFA
+from automata.determinize import determinize, LazyDFA
+from automata.dfa import DFA
+from collections.abc import Iterable
 from typing import override
 
 class NFA(BasicAutomaton):
 
+    # Kind of automaton in the binary format
+    kind = "NFA"
+
+    # Bitset engine, built on demand by compile()
+    compiled = None
+
     # Preprocessing step, adds EPSILON symbol to the symbols list
     # Implements an abstract method from BasicAutomaton
     @override
@@ -13,50 +21,67 @@ class NFA(BasicAutomaton):
         self.data["symbols"].append("EPSILON")
 
 
+    # Drops the interned form and the engine compiled from it
+    @override
+    def invalidate(self) -> None:
+        super().invalidate()
+        self.compiled = None
+
+
     # Validates the NFA
     # Implements an abstract method from BasicAutomaton
     @override
     def validate_automata(self) -> None:
-        # Perform a type check first
-        assert_dictionary_types(self.data, NFA_TYPES)
-        # Then perform a list of value-checking functions
-        for check in NFA_VALIDATORS:
-            check(self.data)
+        # Check types and values in a single pass, reporting every error found
+        validate(self.kind, self.data)
 
 
     # Puts the NFA in its starting state
     # Implements an abstract method from BasicAutomaton
     @override
     def starting_state(self) -> None:
+        interned = self.interned or self.intern()
         # NFA state is represented as a list of simultaneous states
         # Start by initializing the states list with an empty list
         self.state = []
         # Then start filling it, by entering the starting state
-        self.enter_state(self.data["initial"])
+        self.enter(interned.initial)
 
 
     # Helper method to move the automata into a state
     # Any EPSILON transitions will be resolved along the way
     def enter_state(self, new_state: str) -> None:
-        # Add the new state, if not already in it from some other branch
-        if new_state not in self.state:
-            self.state.append(new_state)
-        # Perform epsilon transitions, if the new state has them
-        if "EPSILON" in self.data["ruleset"][new_state].keys():
-            for other_state in self.data["ruleset"][new_state]["EPSILON"]:
-                self.enter_state(other_state)
+        interned = self.interned or self.intern()
+        self.enter(interned.states.ids[new_state])
+
+
+    # Moves the automata into a state, given by its id
+    # EPSILON transitions are followed depth-first with a stack, each state once,
+    # so that cycles of EPSILON transitions end
+    def enter(self, new_state: int) -> None:
+        interned = self.interned or self.intern()
+        names, epsilon = interned.states.names, interned.symbols.ids.get("EPSILON")
+        stack, seen = [new_state], set()
+        while stack:
+            state = stack.pop()
+            if state in seen:
+                continue
+            seen.add(state)
+            # Add the state, if not already in it from some other branch
+            if names[state] not in self.state:
+                self.state.append(names[state])
+            # Perform epsilon transitions, if the state has them, in order
+            if epsilon is not None and interned.present[interned.index(state, epsilon)]:
+                stack += reversed(interned.successors(state, epsilon))
 
 
     # Returns True if the automata is in an accepting state
     # Implements an abstract method from BasicAutomaton
     @override
     def accepting(self) -> bool:
+        interned = self.interned or self.intern()
         # Go through every current state to find at least one that accepts
-        for current_state in self.state:
-            if current_state in self.data["accepting"]:
-                return True
-        # If no accepting state was found, the automaton is rejecting
-        return False
+        return any(interned.accepting[interned.states.ids[state]] for state in self.state)
 
 
     # Changes the states of the automata based on the input symbol
@@ -64,30 +89,61 @@ class NFA(BasicAutomaton):
     # Implements an abstract method from BasicAutomaton
     @override
     def action(self, symbol: str) -> None:
+        interned = self.interned or self.intern()
         # Validate the symbol first
-        if symbol not in self.data["symbols"]:
+        symbol_id = interned.symbols.ids.get(symbol)
+        if symbol_id is None:
             raise ValueError(f"Symbol {symbol} not recognized")
 
-        # We save the list of states that have to be parsed
-        # A simple copy would work, but a deepcopy is safer, in case the 
-        # states list will ever be made to contain non-primitive elements
-        parse_list = deepcopy(self.state)
+        # We save the list of states that have to be parsed, as ids
+        parse_list = [interned.states.ids[state] for state in self.state]
         
         # First, we remove all the states that will be abandoned
         # We can't remove them "as we go" as it might alter behavior
         for current_state in parse_list:
             # If there will be something to do in the current state
-            if symbol in self.data["ruleset"][current_state].keys():
+            if interned.present[interned.index(current_state, symbol_id)]:
                 # Then that state will be abandoned, so remove it
-                self.state.remove(current_state)
+                self.state.remove(interned.states.names[current_state])
 
         # Go through the state list and perform transitions
         # States that weren't abandoned will simply not change anything when parsed
         for current_state in parse_list:
             # If the transition function has an entry for (current_state, symbol) -> [new_states]
-            if symbol in self.data["ruleset"][current_state].keys():
+            if interned.present[interned.index(current_state, symbol_id)]:
                 # For every new state the automaton can transition into
-                for new_state in self.data["ruleset"][current_state][symbol]:
+                for new_state in interned.successors(current_state, symbol_id):
                     # Enter the new state, resolving any EPSILON transitions
-                    self.enter_state(new_state)
-    
+                    self.enter(new_state)
+
+
+    # Precomputes EPSILON closures and successor bitmasks for every (state, symbol),
+    # from the interned states and symbols
+    # The engine is dropped by invalidate(), and built again when needed
+    def compile(self) -> CompiledNFA:
+        self.compiled = CompiledNFA(self.interned or self.intern())
+        return self.compiled
+
+
+    # Classifies a batch of inputs (sequences of symbols) using the bitset engine
+    # Each input is run from the initial state, the NFA's own state is left untouched
+    # Returns the accept flags and the final lists of states
+    def run_many(self, inputs: Iterable[Iterable[str]]) -> tuple[list[bool], list[list[str]]]:
+        if self.compiled is None:
+            self.compile()
+        return self.compiled.run_many(inputs)
+
+
+    # Converts the NFA into an equivalent DFA through subset construction
+    # The DFA has data in the usual schema, so it can be saved with save_automata
+    def to_dfa(self, max_states: int = None) -> DFA:
+        if self.compiled is None:
+            self.compile()
+        return determinize(self.compiled, max_states)
+
+
+    # Returns a DFA that determinizes the NFA on demand, caching up to capacity subsets
+    def lazy_dfa(self, capacity: int = 1024) -> LazyDFA:
+        if self.compiled is None:
+            self.compile()
+        return LazyDFA(self.compiled, capacity)
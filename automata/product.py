@@ -0,0 +1,142 @@
+from automata.basicautomaton import BasicAutomaton
+from automata.dfa import DFA
+from automata.nfa import NFA
+from collections.abc import Callable, Iterable
+from operator import call
+from typing import override
+
+# Returns the functions a DFA or NFA is run through in a product, on its compiled form
+# (state ids through the transition table's columns, or bitmasks of NFA states): one giving,
+# for a symbol, the function that moves a state on it, then its initial state, its accepting
+# test and the function naming its states
+def component(automaton: BasicAutomaton) -> tuple[Callable, int, Callable, Callable]:
+    if isinstance(automaton, DFA):
+        dfa = automaton.compiled or automaton.compile()
+        return lambda symbol: dfa.columns[symbol].__getitem__, dfa.initial, dfa.accepting_list.__getitem__, dfa.states.__getitem__
+
+    if isinstance(automaton, NFA):
+        nfa = automaton.compiled or automaton.compile()
+        return lambda symbol: lambda mask: nfa.step(mask, symbol), nfa.initial, lambda mask: mask & nfa.accepting != 0, nfa.names
+
+    raise ValueError(f"Expected a DFA or a NFA, got {type(automaton).__name__}")
+
+
+# Product of several DFAs and NFAs sharing an alphabet, which runs all of them in a single pass
+# Product states are tuples of component states (DFA state ids, NFA state bitmasks), built
+# lazily: a state is only created when first reached, and its transitions when first taken
+# Every product state carries the indices of the components accepting in it, so reading an
+# input once tells which of the automata match it
+class ProductAutomaton(BasicAutomaton):
+
+    # Combines automata, given as loaded DFA and NFA objects, whose states are left untouched
+    # Raises a ValueError if more than max_states product states would be needed
+    def __init__(self, automata: Iterable[BasicAutomaton], max_states: int = None):
+        super().__init__()
+        self.automata = list(automata)
+        self.max_states = max_states
+
+        # EPSILON is only an input symbol for NFAs, the shared alphabet leaves it out
+        alphabets = [set((automaton.interned or automaton.intern()).symbols.names) - {"EPSILON"} for automaton in self.automata]
+        if any(alphabet != alphabets[0] for alphabet in alphabets):
+            raise ValueError("The automata don't share the same alphabet")
+        self.symbols = alphabets[0] if alphabets else set()
+
+        # Functions moving the components' states on every symbol, gathered when first needed
+        self.movers = dict()
+        self.steps, initial, self.tests, self.namers = [], [], [], []
+        for automaton in self.automata:
+            step, state, test, namer = component(automaton)
+            self.steps.append(step)
+            initial.append(state)
+            self.tests.append(test)
+            self.namers.append(namer)
+
+        # Product states in discovery order, with their ids, the transitions found so far
+        # and the indices of the components accepting in them
+        self.keys, self.ids, self.rules, self.matching = [], dict(), [], []
+        self.initial = self.add(tuple(initial))
+
+        self.starting_state()
+
+
+    # Returns the id of a product state, creating it if it is new
+    def add(self, key: tuple) -> int:
+        index = self.ids.get(key)
+        if index is None:
+            if self.max_states is not None and len(self.keys) == self.max_states:
+                raise ValueError(f"The product needs more than {self.max_states} states")
+            index = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.rules.append(dict())
+            self.matching.append([position for position, accepting in enumerate(map(call, self.tests, key)) if accepting])
+        return index
+
+
+    # Returns the product state reached from a product state on a symbol, computing it on a miss
+    def transition(self, index: int, symbol: str) -> int:
+        next_index = self.rules[index].get(symbol)
+        if next_index is None:
+            movers = self.movers.get(symbol)
+            if movers is None:
+                if symbol not in self.symbols:
+                    raise ValueError(f"Symbol {symbol} not recognized")
+                movers = self.movers[symbol] = [step(symbol) for step in self.steps]
+            key = tuple(map(call, movers, self.keys[index]))
+            next_index = self.rules[index][symbol] = self.add(key)
+        return next_index
+
+
+    # Puts the product, and so every component, in its initial state
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def starting_state(self) -> None:
+        self.index = self.initial
+
+
+    # The current state of every component, by name (a list of states for NFAs)
+    @property
+    def state(self) -> list:
+        return [namer(state) for namer, state in zip(self.namers, self.keys[self.index])]
+
+
+    # Returns True if any component is in an accepting state
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def accepting(self) -> bool:
+        return len(self.matching[self.index]) > 0
+
+
+    # Returns the indices of the components in an accepting state
+    def matches(self) -> list[int]:
+        return list(self.matching[self.index])
+
+
+    # Changes the state of every component based on the input symbol
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def action(self, symbol: str) -> None:
+        self.index = self.transition(self.index, symbol)
+
+
+    # Runs a sequence of symbols from the initial state, leaving the product's own state untouched
+    # Returns the indices of the components accepting it
+    def run(self, symbols: Iterable[str]) -> list[int]:
+        index, rules = self.initial, self.rules
+        for symbol in symbols:
+            next_index = rules[index].get(symbol)
+            index = self.transition(index, symbol) if next_index is None else next_index
+        return list(self.matching[index])
+
+
+    # Runs a batch of inputs, returning the indices of the components accepting each of them
+    def run_many(self, inputs: Iterable[Iterable[str]]) -> list[list[int]]:
+        return [self.run(symbols) for symbols in inputs]
+
+
+    # Returns the number of product states and transitions built so far
+    def stats(self) -> dict:
+        return {
+            "components": len(self.automata),
+            "states": len(self.keys),
+            "transitions": sum(len(rules) for rules in self.rules)
+        }
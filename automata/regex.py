@@ -0,0 +1,319 @@
+import hashlib
+import json
+import os
+import tempfile
+from automata.basicautomaton import BasicAutomaton
+from automata.determinize import determinize
+from automata.dfa import DFA
+from automata.nfa import NFA
+from collections import OrderedDict
+
+# Regular expressions over single-character symbols, compiled into NFAs by Thompson's construction
+# Supported syntax: literal characters, . (any symbol of the alphabet), [abc], [a-z] and [^abc]
+# classes, grouping with (), alternation with |, and the *, + and ? operators
+# A backslash makes the next character a literal, and an empty pattern (or branch) matches
+# the empty input
+# Patterns match whole inputs, i.e. the automaton accepts an input if the pattern matches all of it
+
+# Characters with a meaning of their own outside of classes
+SPECIAL = set("()|*+?.[]\\")
+# Version of the compiled form, part of every on-disk cache key
+CACHE_VERSION = 1
+
+
+# Recursive descent parser, turning a pattern into a syntax tree of tuples:
+# ("empty",), ("set", characters), ("cat", first, second), ("alt", first, second),
+# ("star", inner), ("plus", inner) and ("opt", inner)
+class Parser:
+
+    # Parses a pattern, with "." and negated classes taken over the given alphabet
+    def __init__(self, pattern: str, alphabet: set[str]):
+        self.pattern = pattern
+        self.alphabet = alphabet
+        self.position = 0
+
+
+    # Returns the syntax tree of the whole pattern
+    # Raises a ValueError at the first syntax error
+    def parse(self) -> tuple:
+        tree = self.alternation()
+        if self.position < len(self.pattern):
+            raise ValueError(f"Unexpected {self.pattern[self.position]!r} at position {self.position}")
+        return tree
+
+
+    # Returns the next character, or an empty string at the end of the pattern
+    def peek(self) -> str:
+        return self.pattern[self.position:self.position + 1]
+
+
+    # Returns the next character, which has to be there, and moves past it
+    def next(self) -> str:
+        if self.position == len(self.pattern):
+            raise ValueError("Unexpected end of the pattern")
+        self.position += 1
+        return self.pattern[self.position - 1]
+
+
+    # alternation := concatenation ("|" concatenation)*
+    def alternation(self) -> tuple:
+        tree = self.concatenation()
+        while self.peek() == "|":
+            self.position += 1
+            tree = ("alt", tree, self.concatenation())
+        return tree
+
+
+    # concatenation := repetition*
+    def concatenation(self) -> tuple:
+        tree = ("empty",)
+        while self.peek() not in ["", "|", ")"]:
+            repetition = self.repetition()
+            tree = repetition if tree == ("empty",) else ("cat", tree, repetition)
+        return tree
+
+
+    # repetition := atom ("*" | "+" | "?")*
+    def repetition(self) -> tuple:
+        tree = self.atom()
+        while self.peek() in ["*", "+", "?"]:
+            tree = ({"*": "star", "+": "plus", "?": "opt"}[self.next()], tree)
+        return tree
+
+
+    # atom := "(" alternation ")" | "[" class "]" | "." | "\" character | character
+    def atom(self) -> tuple:
+        character = self.next()
+        if character == "(":
+            tree = self.alternation()
+            if self.peek() != ")":
+                raise ValueError(f"Missing ')' at position {self.position}")
+            self.position += 1
+            return tree
+        if character == "[":
+            return ("set", self.character_class())
+        if character == ".":
+            return ("set", frozenset(self.alphabet))
+        if character == "\\":
+            return ("set", frozenset(self.next()))
+        if character in SPECIAL:
+            raise ValueError(f"Unexpected {character!r} at position {self.position - 1}")
+        return ("set", frozenset(character))
+
+
+    # Returns the characters of a class, after its opening bracket
+    # A "]" right after the opening bracket (or the "^") is taken literally
+    def character_class(self) -> frozenset[str]:
+        negated = self.peek() == "^"
+        if negated:
+            self.position += 1
+
+        characters, first = set(), True
+        while first or self.peek() != "]":
+            first = False
+            start = self.next()
+            if start == "\\":
+                start = self.next()
+            # Ranges, unless the "-" is the last character of the class
+            if self.peek() == "-" and self.pattern[self.position + 1:self.position + 2] not in ["", "]"]:
+                self.position += 1
+                end = self.next()
+                if end == "\\":
+                    end = self.next()
+                if ord(end) < ord(start):
+                    raise ValueError(f"Invalid range {start}-{end} at position {self.position}")
+                characters.update(chr(code) for code in range(ord(start), ord(end) + 1))
+            else:
+                characters.add(start)
+        self.position += 1
+
+        return frozenset(self.alphabet - characters if negated else characters)
+
+
+# Returns the characters a pattern matches literally or in classes (ranges included), which
+# are its alphabet when none is given, so "." and negated classes only match these
+def pattern_alphabet(pattern: str) -> list[str]:
+    characters, stack = set(), [Parser(pattern, set()).parse()]
+    while stack:
+        node = stack.pop()
+        if node[0] == "set":
+            characters |= node[1]
+        elif node[0] != "empty":
+            stack += node[1:]
+    return sorted(characters)
+
+
+# Thompson's construction, builds the data of a NFA matching a pattern, in the usual schema
+# The alphabet defaults to the pattern's own characters, and must hold single characters
+# As a missing rule keeps a NFA state active, every state gets a rule for every symbol,
+# those with nothing to do on it going to a rejecting "dead" state, which has no rules
+def thompson_data(pattern: str, symbols: list[str] = None) -> dict:
+    if symbols is None:
+        symbols = pattern_alphabet(pattern)
+    if any(len(symbol) != 1 for symbol in symbols) or "EPSILON" in symbols:
+        raise ValueError("Regular expressions need an alphabet of single characters")
+    tree = Parser(pattern, set(symbols)).parse()
+
+    # Rules of every state, as {symbol: [next states]}
+    rules = []
+
+    def new_state() -> int:
+        rules.append(dict())
+        return len(rules) - 1
+
+    def link(state: int, symbol: str, next_state: int) -> None:
+        rules[state].setdefault(symbol, []).append(next_state)
+
+    # Every subtree becomes a fragment, given by its start and end states, built in post-order
+    # with a stack, so that the fragments of a node's children are on top of fragments
+    fragments, stack = [], [(tree, False)]
+    while stack:
+        node, ready = stack.pop()
+        kind = node[0]
+        if not ready and kind not in ["empty", "set"]:
+            stack.append((node, True))
+            stack += [(child, False) for child in reversed(node[1:])]
+            continue
+
+        if kind == "empty":
+            state = new_state()
+            fragments.append((state, state))
+        elif kind == "set":
+            start, end = new_state(), new_state()
+            for character in sorted(node[1]):
+                if character not in symbols:
+                    raise ValueError(f"Symbol {character} not in the alphabet")
+                link(start, character, end)
+            fragments.append((start, end))
+        elif kind in ["cat", "alt"]:
+            (first_start, first_end), (second_start, second_end) = fragments[-2:]
+            del fragments[-2:]
+            if kind == "cat":
+                link(first_end, "EPSILON", second_start)
+                fragments.append((first_start, second_end))
+            else:
+                start, end = new_state(), new_state()
+                link(start, "EPSILON", first_start)
+                link(start, "EPSILON", second_start)
+                link(first_end, "EPSILON", end)
+                link(second_end, "EPSILON", end)
+                fragments.append((start, end))
+        else:
+            inner_start, inner_end = fragments.pop()
+            start, end = new_state(), new_state()
+            link(start, "EPSILON", inner_start)
+            link(inner_end, "EPSILON", end)
+            if kind in ["star", "opt"]:
+                link(start, "EPSILON", end)
+            if kind in ["star", "plus"]:
+                link(inner_end, "EPSILON", inner_start)
+            fragments.append((start, end))
+
+    start, end = fragments.pop()
+    dead = new_state()
+    for state in range(dead):
+        for symbol in symbols:
+            rules[state].setdefault(symbol, [dead])
+
+    names = [f"q{state}" for state in range(len(rules))]
+    return {
+        "states": names,
+        "accepting": [names[end]],
+        "initial": names[start],
+        "symbols": list(symbols),
+        "ruleset": {names[state]: {symbol: [names[next_state] for next_state in next_states]
+                                   for symbol, next_states in action.items()}
+                    for state, action in enumerate(rules)}
+    }
+
+
+# Compiles a pattern into a NFA, see thompson_data
+def compile_nfa(pattern: str, symbols: list[str] = None) -> NFA:
+    nfa = NFA()
+    nfa.load_data(thompson_data(pattern, symbols))
+    return nfa
+
+
+# Compiles a pattern into a DFA, by subset construction over the pattern's NFA (leaving the
+# EPSILON symbol out), then minimization unless minimize is False
+# Raises a ValueError if more than max_states subsets would be needed
+def compile_dfa(pattern: str, symbols: list[str] = None, minimize: bool = True, max_states: int = None) -> DFA:
+    compiled = compile_nfa(pattern, symbols).compile()
+    dfa = determinize(compiled, max_states, compiled.symbols[:-1])
+    return dfa.minimize() if minimize else dfa
+
+
+# Cache of compiled patterns, keyed by pattern, alphabet and kind of automaton
+# Recently used automata are kept in memory, up to capacity, and with a directory given, every
+# compiled automaton is also saved there in the binary format (see automata/binary.py), so that
+# later processes load it instead of compiling the pattern again, skipping validation
+# Cached automata are shared: they have to be put in their starting state before being run
+# action by action (run_many() and scan() leave their state alone)
+class PatternCache:
+
+    # Keeps up to capacity automata in memory, and saves them in directory if one is given
+    def __init__(self, capacity: int = 128, directory: str = None):
+        self.capacity = capacity
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        self.cache = OrderedDict()
+        # Cache statistics: memory hits, disk hits and compilations
+        self.hits, self.loads, self.misses = 0, 0, 0
+
+
+    # Returns the path of the file caching an automaton
+    def path(self, key: tuple) -> str:
+        digest = hashlib.sha256(json.dumps([CACHE_VERSION, *key]).encode()).hexdigest()
+        return os.path.join(self.directory, digest + ".bin")
+
+
+    # Returns the automaton compiled from a pattern: a NFA, or with deterministic set, a DFA,
+    # minimal unless minimize is False
+    def get(self, pattern: str, symbols: list[str] = None, deterministic: bool = False,
+            minimize: bool = True) -> BasicAutomaton:
+        kind = ("minimal DFA" if minimize else "DFA") if deterministic else "NFA"
+        key = (pattern, None if symbols is None else list(symbols), kind)
+        memory_key = json.dumps(key)
+
+        automaton = self.cache.get(memory_key)
+        if automaton is not None:
+            self.hits += 1
+            self.cache.move_to_end(memory_key)
+            return automaton
+
+        path = None if self.directory is None else self.path(key)
+        if path is not None and os.path.exists(path):
+            self.loads += 1
+            automaton = DFA() if deterministic else NFA()
+            automaton.load(path)
+        else:
+            self.misses += 1
+            if deterministic:
+                automaton = compile_dfa(pattern, symbols, minimize)
+                automaton.validated = True
+            else:
+                automaton = compile_nfa(pattern, symbols)
+            if path is not None:
+                # Written next to its final place and renamed, so other processes never see half of it
+                handle, temporary = tempfile.mkstemp(dir=self.directory)
+                os.close(handle)
+                automaton.save(temporary)
+                os.replace(temporary, path)
+
+        self.cache[memory_key] = automaton
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+        return automaton
+
+
+    # Returns the cache statistics
+    def stats(self) -> dict:
+        return {
+            "automata": len(self.cache),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "loads": self.loads,
+            "misses": self.misses
+        }
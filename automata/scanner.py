@@ -0,0 +1,154 @@
+import mmap
+import numpy as np
+from automata.interned import InternedAutomaton
+
+# Bytes read from files at once
+CHUNK_SIZE = 1 << 20
+# Length of the blocks a chunk is cut into when reporting offsets, see DFAScanner.step()
+REPORT_BLOCK = 512
+
+
+# Returns the default byte to symbol mapping of an alphabet: every single-character
+# symbol whose code point fits in a byte is read from that byte (as in Latin-1)
+def default_mapping(symbols: list[str]) -> dict[int, str]:
+    return {ord(symbol): symbol for symbol in symbols if len(symbol) == 1 and ord(symbol) < 256}
+
+
+# Scans byte inputs (bytes, bytearray, memoryview, mmap or files) through a DFA, chunk by chunk
+# Bytes are translated into symbols through a 256-entry table, and the scanner's state
+# (the current state and the number of bytes consumed) is kept between chunks, so a
+# scan can go on across reads or network frames, or be saved and resumed later
+# Like DFA.action, a byte whose symbol has no rule in the current state leaves it in place
+class DFAScanner:
+
+    # Builds the translation and transition tables from the interned form of a DFA
+    # mapping gives the symbol read from every byte, as {byte: symbol}, with bytes given as
+    # integers or one-character strings (or bytes), and defaults to the single-character symbols
+    def __init__(self, interned: InternedAutomaton, mapping: dict[int | str | bytes, str] = None):
+        self.names = interned.states.names
+        if mapping is None:
+            mapping = default_mapping(interned.symbols.names)
+
+        # Interned id of the symbol every mapped byte is translated to (-1 for bytes that aren't mapped)
+        self.translation = np.full(256, -1, dtype=np.int32)
+        for key, symbol in mapping.items():
+            byte = key if isinstance(key, int) else ord(key)
+            if not 0 <= byte < 256:
+                raise ValueError(f"Byte {key!r} is out of range")
+            if symbol not in interned.symbols.ids:
+                raise ValueError(f"Symbol {symbol} not recognized")
+            self.translation[byte] = interned.symbols.ids[symbol]
+
+        # The interned transitions, with states premultiplied by the symbol count (the stride of
+        # the interned table), so that a step is a single list index: next state = table[state + symbol id]
+        # A missing rule is a self-loop, which keeps the "no rule means staying in place" behavior
+        self.stride = max(len(interned.symbols), 1)
+        self.table = [(index // self.stride if next_state == -1 else next_state) * self.stride
+                      for index, next_state in enumerate(interned.table)]
+
+        self.initial = interned.initial * self.stride
+        # Whether every state is accepting, indexed like the table, by premultiplied state
+        self.accepting_flags = np.zeros(len(self.names) * self.stride, dtype=bool)
+        self.accepting_flags[::self.stride] = np.frombuffer(interned.accepting, dtype=np.uint8)
+        # NumPy copy of the table, to run blocks of ids in lockstep
+        self.lockstep_table = np.array(self.table, dtype=np.int64)
+        self.reset()
+
+
+    # Puts the scanner back in the DFA's initial state, or in a given state (by name),
+    # having consumed offset bytes, e.g. to resume a scan saved with checkpoint()
+    def reset(self, state: str = None, offset: int = 0) -> None:
+        self.state = self.initial if state is None else self.names.index(state) * self.stride
+        self.offset = offset
+
+
+    # Returns the current state's name and the number of bytes consumed, which reset() takes back
+    def checkpoint(self) -> tuple[str, int]:
+        return self.names[self.state // self.stride], self.offset
+
+
+    # Returns True if the scanner is in an accepting state
+    def accepting(self) -> bool:
+        return bool(self.accepting_flags[self.state])
+
+
+    # Consumes a chunk of bytes, continuing from the current state
+    # With report set, returns the offsets (counted from the start of the scan) right after
+    # every byte that led to an accepting state, i.e. the lengths of the accepted prefixes
+    # The chunk is read in place, and translated into a single array of ids, which is run
+    # through a memoryview rather than copied into a list
+    # Raises ValueError on a byte that isn't mapped, after consuming the bytes before it
+    # (checkpoint() then gives the state reached and the offset of that byte)
+    def feed(self, chunk, report: bool = False) -> list[int]:
+        ids = self.translation[np.frombuffer(chunk, dtype=np.uint8)]
+        if len(ids) and ids.min() < 0:
+            bad = int(np.argmax(ids < 0))
+            self.step(ids[:bad], False)
+            raise ValueError(f"Byte {chunk[bad]:#04x} at offset {self.offset} not recognized")
+        return self.step(ids, report)
+
+
+    # Runs an array of local symbol ids, see feed()
+    def step(self, ids: np.ndarray, report: bool) -> list[int]:
+        table, state, view = self.table, self.state, ids.data
+        if report:
+            # The ids are cut into blocks of REPORT_BLOCK, and the state every block starts in is
+            # found by running them one by one, then all the blocks are run again at once, one
+            # table lookup per position (as in CompiledDFA.run_lockstep), into a mask of the
+            # accepting positions, which avoids testing every state in Python
+            full = len(ids) - len(ids) % REPORT_BLOCK
+            starts = []
+            for start in range(0, full, REPORT_BLOCK):
+                starts.append(state)
+                for symbol in view[start:start + REPORT_BLOCK]:
+                    state = table[state + symbol]
+
+            hits = np.empty(len(ids), dtype=bool)
+            blocks, block_hits = ids[:full].reshape(-1, REPORT_BLOCK), hits[:full].reshape(-1, REPORT_BLOCK)
+            states = np.array(starts, dtype=np.int64)
+            for position in range(REPORT_BLOCK if starts else 0):
+                states = np.take(self.lockstep_table, states + blocks[:, position])
+                block_hits[:, position] = self.accepting_flags[states]
+            # The ids after the last whole block are few, and run one by one
+            for position in range(full, len(ids)):
+                state = table[state + view[position]]
+                hits[position] = self.accepting_flags[state]
+            offsets = (np.flatnonzero(hits) + self.offset + 1).tolist()
+        else:
+            for symbol in view:
+                state = table[state + symbol]
+            offsets = []
+
+        self.state = state
+        self.offset += len(ids)
+        return offsets
+
+
+    # Scans a whole source, continuing from the current state: a bytes-like object
+    # (including an mmap), a binary file object, or a filename, which is memory-mapped
+    # Sources are fed chunk_size bytes at a time, files being read into a single reused buffer
+    # Returns whether the input was accepted, or with report set, the offsets found by feed()
+    def scan(self, source, report: bool = False, chunk_size: int = CHUNK_SIZE) -> bool | list[int]:
+        offsets = []
+        if isinstance(source, str):
+            with open(source, "rb") as file:
+                # Empty files can't be mapped
+                if file.seek(0, 2) == 0:
+                    return offsets if report else self.accepting()
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return self.scan(mapped, report, chunk_size)
+
+        if hasattr(source, "readinto"):
+            buffer = bytearray(chunk_size)
+            with memoryview(buffer) as view:
+                while size := source.readinto(buffer):
+                    with view[:size] as chunk:
+                        offsets += self.feed(chunk, report)
+        else:
+            # Views are released before returning, so that a memory-mapped source can be closed
+            with memoryview(source) as view:
+                for start in range(0, len(view), chunk_size):
+                    with view[start:start + chunk_size] as chunk:
+                        offsets += self.feed(chunk, report)
+
+        return offsets if report else self.accepting()
@@ -0,0 +1,194 @@
+import json
+import re
+from automata.checks.validator import check_action, check_members, check_tm_rule, check_values, is_string_list, raise_errors
+
+# Characters read from the file at once
+CHUNK_SIZE = 1 << 16
+# Symbols added to the definition by preprocess(), which rules may already use
+IMPLICIT_SYMBOLS = {"NFA": ["EPSILON"]}
+# Members streamed one element at a time, instead of being parsed whole
+STREAMED_LISTS = ["states", "accepting", "symbols"]
+WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+
+# Reads JSON values one by one from a file, keeping only a chunk of it in memory
+# Values are parsed with the json module's own decoder, from the current position
+class JSONStream:
+
+    # Starts reading a text file
+    def __init__(self, file, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer, self.position, self.ended = "", 0, False
+        self.decoder = json.JSONDecoder()
+
+
+    # Reads the next chunk, dropping what was already parsed
+    # Returns False once the whole file was read
+    def fill(self) -> bool:
+        if self.ended:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        self.ended = chunk == ""
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return not self.ended
+
+
+    # Returns the next character that isn't whitespace, without moving past it
+    # Returns an empty string at the end of the file
+    def peek(self) -> str:
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or not self.fill():
+                return self.buffer[self.position:self.position + 1]
+
+
+    # Moves past the next character that isn't whitespace, which has to be one of the given ones
+    # Returns that character
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if character == "" or character not in characters:
+            raise ValueError(f"Invalid JSON: expected one of {characters!r}, got {character or "the end of the file"!r}")
+        self.position += 1
+        return character
+
+
+    # Parses the next value
+    # A value reaching the end of the buffer may go on in the next chunk (like a number
+    # cut in half), so it is only accepted once more of the file is read, or it ended
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                parsed, end = self.decoder.raw_decode(self.buffer, self.position)
+                if end < len(self.buffer) or self.ended:
+                    self.position = end
+                    return parsed
+            except json.JSONDecodeError as error:
+                if self.ended:
+                    raise ValueError(f"Invalid JSON: {error.msg}")
+            self.fill()
+
+
+    # Yields the elements of the next value, which has to be a list, one at a time
+    def elements(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+    # Yields the (key, value) pairs of the next value, which has to be an object, one at a time
+    def members(self):
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError("Invalid JSON: object keys have to be strings")
+            self.expect(":")
+            yield key, self.value()
+            if self.expect(",}") == "}":
+                return
+
+
+# Streams an automaton definition of the given kind ("DFA", "NFA" or "TM") from a JSON file
+# Strings are interned as they are read, so every state and symbol name is stored once,
+# comment members (starting with "__") are dropped, and rules are validated as they arrive
+# (or at the end, for rules found before the states and symbols)
+# Raises an exception listing every error found, like automata/checks/validator.py
+def stream_definition(filename: str, kind: str, chunk_size: int = CHUNK_SIZE) -> dict:
+    strings, data, errors = dict(), dict(), []
+    # Sets of states, symbols and shifts, once they are all read
+    known = None
+    # Whether rules were found before the states and symbols
+    deferred = False
+    needed = ["states", "symbols"] + (["increment", "decrement"] if kind == "TM" else [])
+
+    # Returns the single stored copy of a string, leaving other values alone
+    def intern(value):
+        return strings.setdefault(value, value) if isinstance(value, str) else value
+
+    # Checks the rules of a state, or a TM rule, if the states and symbols are known
+    def check(key, rules) -> None:
+        nonlocal deferred
+        if known is None:
+            deferred = True
+        elif kind == "TM":
+            check_tm_rule(key, rules, known[0], known[1], known[2], errors)
+        else:
+            check_action(key, rules, known[0], known[1], kind == "NFA", errors)
+
+    with open(filename, "r") as file:
+        stream = JSONStream(file, chunk_size)
+        stream.expect("{")
+        ended = stream.peek() == "}"
+        if ended:
+            stream.position += 1
+
+        while not ended:
+            key = stream.value()
+            if not isinstance(key, str):
+                raise ValueError("Invalid JSON: object keys have to be strings")
+            stream.expect(":")
+            opening = stream.peek()
+
+            if key.startswith("__"):
+                # Comments are parsed and dropped right away
+                stream.value()
+            elif key in STREAMED_LISTS and opening == "[":
+                data[key] = [intern(element) for element in stream.elements()]
+            elif key == "ruleset" and kind == "TM" and opening == "[":
+                data[key] = []
+                for index, rule in enumerate(stream.elements()):
+                    if isinstance(rule, dict):
+                        rule = {intern(field): intern(value) for field, value in rule.items()}
+                    data[key].append(rule)
+                    check(index, rule)
+            elif key == "ruleset" and kind != "TM" and opening == "{":
+                data[key] = dict()
+                for state, action in stream.members():
+                    if isinstance(action, dict):
+                        action = {intern(symbol): [intern(target) for target in targets] if isinstance(targets, list) else intern(targets)
+                                  for symbol, targets in action.items()}
+                    data[key][intern(state)] = action
+                    check(state, action)
+            else:
+                data[key] = intern(stream.value())
+
+            # Rules can be checked as they arrive once the states, symbols and shifts are read
+            if known is None and all(member in data for member in needed) and is_string_list(data["states"]) and \
+               is_string_list(data["symbols"]) and all(isinstance(data[member], str) for member in needed[2:]):
+                symbols = set(data["symbols"]) | set(IMPLICIT_SYMBOLS.get(kind, []))
+                known = (set(data["states"]), symbols, {data.get("increment"), data.get("decrement")})
+
+            ended = stream.expect(",}") == "}"
+
+        if stream.peek() != "":
+            raise ValueError("Invalid JSON: extra data after the definition")
+
+    # Members, and the values outside of the ruleset, are checked once everything is read
+    member_errors = []
+    check_members(kind, data, member_errors)
+    raise_errors(kind, member_errors)
+
+    states, symbols = set(data["states"]), set(data["symbols"]) | set(IMPLICIT_SYMBOLS.get(kind, []))
+    value_errors = []
+    check_values(kind, data, states, symbols, value_errors)
+
+    # Rules found too early are checked now, along with every other one, in order
+    if deferred:
+        known = (states, symbols, {data.get("increment"), data.get("decrement")})
+        errors.clear()
+        for key, rules in enumerate(data["ruleset"]) if kind == "TM" else data["ruleset"].items():
+            check(key, rules)
+
+    raise_errors(kind, value_errors + errors)
+    return data
@@ -0,0 +1,163 @@
+import time
+from automata.basicautomaton import BasicAutomaton
+
+# Possible outcomes of a bounded Turing machine run
+HALTED_ACCEPT = "halted-accept"
+HALTED_REJECT = "halted-reject"
+CYCLING = "cycling"
+BUDGET_EXHAUSTED = "budget-exhausted"
+
+# Steps run between two checks of the time budget, when no detector is used
+CHECK_INTERVAL = 65536
+
+
+# The result of a bounded Turing machine run
+class RunResult:
+
+    # outcome is one of the constants above, and period is only set when cycling
+    def __init__(self, outcome: str, steps: int, state: str, elapsed: float, period: int = None):
+        self.outcome = outcome
+        self.steps = steps
+        self.state = state
+        self.elapsed = elapsed
+        self.period = period
+
+
+    def __repr__(self) -> str:
+        period = f", period={self.period}" if self.period is not None else ""
+        return f"RunResult({self.outcome}, steps={self.steps}, state={self.state}{period})"
+
+
+# Detects machines that come back to an exact configuration they were already in,
+# using Brent's algorithm: the configuration is saved at every power of two steps,
+# and each following one is compared to it, so memory use stays constant
+# Comparing configurations is cheap unless the state and head position match
+class CycleDetector:
+
+    # Saves the starting configuration
+    def reset(self, tm: BasicAutomaton) -> None:
+        self.saved = tm.configuration()
+        self.power, self.length = 1, 0
+
+
+    # Called after every step, returns the cycle's period once one is found
+    def check(self, tm: BasicAutomaton, steps: int) -> int | None:
+        self.length += 1
+        if self.saved[0] == tm.state and self.saved[1] == tm.tape_pointer and self.saved == tm.configuration():
+            return self.length
+
+        # Move the saved configuration forward on every power of two
+        if self.length == self.power:
+            self.saved = tm.configuration()
+            self.power *= 2
+            self.length = 0
+
+        return None
+
+
+# Detects translated cyclers, i.e. machines that keep repeating the same behavior
+# while moving further into the blank part of the tape, in either direction
+# Every time the head reaches a new record position, the tape behind it is saved
+# (up to window cells) and compared to the one saved at the last record in the same
+# state; if they match over every cell visited in between, the machine is cycling
+class TranslatedCyclerDetector:
+
+    # window is how many cells behind the head are compared at most
+    def __init__(self, window: int = 1024):
+        self.window = window
+
+
+    # Finds the part of the tape already written, which records have to go beyond
+    def reset(self, tm: BasicAutomaton) -> None:
+        _, pointer, first, tape = tm.configuration()
+        self.left = min(pointer, first)
+        self.right = max(pointer, first + len(tape) - 1)
+        # Head positions reached since the last record
+        self.low, self.high = pointer, pointer
+        # Last record in each state and direction, as [step, position, saved tape, furthest excursion]
+        self.records = {1: dict(), -1: dict()}
+
+
+    # Called after every step, returns the cycle's period once one is found
+    def check(self, tm: BasicAutomaton, steps: int) -> int | None:
+        pointer = tm.tape_pointer
+        self.low, self.high = min(self.low, pointer), max(self.high, pointer)
+
+        if pointer > self.right:
+            direction, self.right = 1, pointer
+        elif pointer < self.left:
+            direction, self.left = -1, pointer
+        else:
+            return None
+
+        # Update how far back the head went since each of the older records
+        for record in self.records[1].values():
+            record[3] = min(record[3], self.low)
+        for record in self.records[-1].values():
+            record[3] = max(record[3], self.high)
+        self.low, self.high = pointer, pointer
+
+        # A strict machine halts when moving left of the tape's start, so it can't cycle there
+        if direction == -1 and tm.strict:
+            return None
+
+        # The saved tape goes from the head backwards
+        if direction == 1:
+            saved = tm.get_tape(pointer - self.window, pointer)[::-1]
+        else:
+            saved = tm.get_tape(pointer, pointer + self.window)
+
+        record = self.records[direction].get(tm.state)
+        if record is not None:
+            step, position, old_saved, furthest = record
+            # Cells between the record and the furthest the head went back have to match
+            distance = (position - furthest) * direction
+            if distance < self.window and saved[:distance + 1] == old_saved[:distance + 1]:
+                return steps - step
+
+        self.records[direction][tm.state] = [steps, pointer, saved, pointer]
+        return None
+
+
+# Runs a Turing machine until it halts, a detector finds a cycle, or a budget runs out
+# max_steps bounds the number of steps, max_time the seconds spent running, and
+# detectors are checked after every step (see CycleDetector for their methods)
+def evaluate(tm: BasicAutomaton, max_steps: int = None, max_time: float = None, detectors: list = ()) -> RunResult:
+    start = time.perf_counter()
+    for detector in detectors:
+        detector.reset(tm)
+
+    steps = 0
+    while not tm.halted:
+        # Check the budgets
+        if max_steps is not None and steps >= max_steps:
+            break
+        if max_time is not None and time.perf_counter() - start > max_time:
+            break
+
+        if not detectors:
+            # Without detectors, run as far as possible before checking the time again
+            if max_time is None and max_steps is not None:
+                chunk = max_steps - steps
+            else:
+                chunk = CHECK_INTERVAL if max_steps is None else min(CHECK_INTERVAL, max_steps - steps)
+            steps += tm.run(chunk)[0]
+            continue
+
+        # Otherwise, step one at a time, checking the detectors in between
+        for _ in range(CHECK_INTERVAL if max_steps is None else min(CHECK_INTERVAL, max_steps - steps)):
+            tm.action()
+            steps += 1
+            if tm.halted:
+                break
+            for detector in detectors:
+                period = detector.check(tm, steps)
+                if period is not None:
+                    return RunResult(CYCLING, steps, tm.state, time.perf_counter() - start, period)
+
+    elapsed = time.perf_counter() - start
+    if not tm.halted:
+        return RunResult(BUDGET_EXHAUSTED, steps, tm.state, elapsed)
+    if tm.accepting():
+        return RunResult(HALTED_ACCEPT, steps, tm.state, elapsed)
+    return RunResult(HALTED_REJECT, steps, tm.state, elapsed)
@@ -1,32 +1,34 @@
 from automata.basicautomaton import BasicAutomaton
-from automata.checks.typecheck import assert_dictionary_types, TM_TYPES
-from automata.checks.valuecheck import TM_VALIDATORS
+from automata.checks.validator import validate
+from automata.termination import evaluate, RunResult
 from collections import defaultdict
 from typing import override
 
 class TM(BasicAutomaton):
 
+    # Kind of automaton in the binary format
+    kind = "TM"
+
     # Validates the TM
     # Implements an abstract method from BasicAutomaton
     @override
     def validate_automata(self) -> None:
-        # Perform a type check first
-        assert_dictionary_types(self.data, TM_TYPES)
-        # Then perform a list of value-checking functions
-        for check in TM_VALIDATORS:
-            check(self.data)
+        # Check types and values in a single pass, reporting every error found
+        validate(self.kind, self.data)
         
 
     # Puts the TM in its starting state, resetting the tape
     # Implements an abstract method from BasicAutomaton
     @override
     def starting_state(self) -> None:
+        interned = self.interned or self.intern()
         # Default tape symbol is a BLANK
-        self.tape = defaultdict(lambda: self.data["blank"])
+        blank = interned.blank
+        self.tape = defaultdict(lambda: blank)
         # Start at the leftmost end of the tape
         self.tape_pointer = 0
         # Start in the initial state
-        self.state = self.data["initial"]
+        self.state = interned.states.names[interned.initial]
         # The machine isn't halted at first
         self.halted = False
         # Strictness = whether we halt when the tape pointer goes to -1
@@ -39,8 +41,9 @@ class TM(BasicAutomaton):
     # Implements an abstract method from BasicAutomaton
     @override
     def accepting(self) -> bool:
+        interned = self.interned or self.intern()
         # A Turing machine accepts if it halts in an accepting state
-        return self.halted and self.state in self.data["accepting"]
+        return self.halted and interned.accepting[interned.states.ids[self.state]] == 1
     
 
     # Changes the states of the automata based on the input and tape
@@ -50,36 +53,27 @@ class TM(BasicAutomaton):
         # A halted machine doesn't do anything
         if self.halted:
             return
-        
-        # Get the current tape symbol
-        tape_symbol = self.tape[self.tape_pointer]
-
-        # Check each rule for the current input symbol
-        for rule in self.data["ruleset"]:
-            # If any rule matches both the current state and the current tape symbol, we use it
-            if rule["old_state"] == self.state and rule["old_tape"] == tape_symbol:
-                # Set the new state
-                self.state = rule["new_state"]
-                # Set the new tape symbol
-                self.tape[self.tape_pointer] = rule["new_tape"]
-
-                # Move the tape pointer
-                # Check against the increment symbol
-                if rule["shift"] == self.data["increment"]:
-                    self.tape_pointer += 1
-                # Check against the decrement symbol
-                elif rule["shift"] == self.data["decrement"]:
-                    self.tape_pointer -= 1
-
-                # Halt when going out-of-bounds
-                if self.strict and self.tape_pointer < 0:
-                    self.halted = True
-
-                # No point in searching further
-                return
-        
+        interned = self.interned or self.intern()
+
+        # Find the first rule matching both the current state and the current tape symbol
+        symbol = interned.symbols.ids.get(self.tape[self.tape_pointer])
+        index = -1 if symbol is None else interned.index(interned.states.ids[self.state], symbol)
+
         # If we didn't find any rule match, halt
-        self.halted = True
+        if index == -1 or interned.table[index] == -1:
+            self.halted = True
+            return
+
+        # Set the new state
+        self.state = interned.states.names[interned.table[index]]
+        # Set the new tape symbol
+        self.tape[self.tape_pointer] = interned.symbols.names[interned.writes[index]]
+        # Move the tape pointer
+        self.tape_pointer += interned.shifts[index]
+
+        # Halt when going out-of-bounds
+        if self.strict and self.tape_pointer < 0:
+            self.halted = True
     
 
     # Runs the turing machine a number of times
@@ -89,6 +83,37 @@ class TM(BasicAutomaton):
             self.action()
 
 
+    # Runs the Turing machine until it halts, for at most max_steps steps
+    # A step is an action on a machine that isn't halted yet, so the step
+    # that finds no matching rule and halts the machine is counted too
+    # Returns the number of steps taken and whether the machine halted
+    def run(self, max_steps: int) -> tuple[int, bool]:
+        steps = 0
+        while steps < max_steps and not self.halted:
+            self.action()
+            steps += 1
+        return steps, self.halted
+
+
+    # Runs the Turing machine within step and time budgets, checking loop detectors
+    # after every step, see automata/termination.py for the detectors available
+    # Returns whether it halted (accepting or rejecting), cycled or ran out of budget
+    def evaluate(self, max_steps: int = None, max_time: float = None, detectors: list = ()) -> RunResult:
+        return evaluate(self, max_steps, max_time, detectors)
+
+
+    # Returns the machine's exact configuration, as a hashable tuple:
+    # (state, head position, position of the first non-blank cell, non-blank part of the tape)
+    def configuration(self) -> tuple:
+        blank = (self.interned or self.intern()).blank
+        written = [position for position, symbol in self.tape.items() if symbol != blank]
+        if not written:
+            return self.state, self.tape_pointer, 0, ()
+
+        first, last = min(written), max(written)
+        return self.state, self.tape_pointer, first, tuple(self.tape.get(position, blank) for position in range(first, last + 1))
+
+
     # Returns the current tape between two values
     def get_tape(self, front: int, back: int) -> list[str]:
         return [self.tape[position] for position in range(front, back + 1)]
@@ -96,14 +121,16 @@ class TM(BasicAutomaton):
 
     # Gives the Turing machine a new tape and optionally sets the head's position
     def set_tape(self, tape: list[str], position: int = 0) -> None:
+        interned = self.interned or self.intern()
         # Check the input first
         for symbol in tape:
             # If any of the symbols we try to set aren't recognized, throw an exception
-            if symbol not in self.data["symbols"]:
+            if symbol not in interned.symbols.ids:
                 raise ValueError(f"Symbol {symbol} was given to be placed on the tape but is not recognized")
             
         # Clear the old tape
-        self.tape = defaultdict(lambda: self.data["blank"])
+        blank = interned.blank
+        self.tape = defaultdict(lambda: blank)
 
         # Write the new tape contents
         for pointer, value in enumerate(tape):
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from automata.turing import TM
+from automata.fastturing import FastTM
+from automata.macroturing import MacroTM
+from automata.termination import CycleDetector, TranslatedCyclerDetector
+
+# Engines that can be picked from the command line
+ENGINES = {"plain": TM, "fast": FastTM, "macro": MacroTM}
+# Progress is reported after this many machines
+REPORT_INTERVAL = 1000
+
+
+# Yields (source, definition) pairs from a directory of .json files, or from a JSONL
+# stream (a file, or "-" for stdin) with a machine definition on every line
+# The source is the file name, or the line number in the stream
+def read_machines(source: str):
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            if filename.endswith(".json"):
+                with open(os.path.join(source, filename), "r") as file:
+                    yield filename, file.read()
+        return
+
+    # Standard input isn't ours to close, files are
+    if source == "-":
+        yield from read_lines(sys.stdin)
+        return
+    with open(source, "r") as stream:
+        yield from read_lines(stream)
+
+
+# Yields (line number, line) pairs for the non-empty lines of a JSONL stream
+def read_lines(stream):
+    for number, line in enumerate(stream, start=1):
+        if line.strip() != "":
+            yield str(number), line
+
+
+# Returns the sources already found in a results file, so that they can be skipped
+def finished_sources(filename: str) -> set[str]:
+    finished = set()
+    if os.path.exists(filename):
+        with open(filename, "r") as file:
+            for line in file:
+                try:
+                    finished.add(json.loads(line)["source"])
+                except (ValueError, KeyError):
+                    # A line cut short by an interruption, that machine runs again
+                    pass
+    return finished
+
+
+# Runs one machine, given as (source, JSON text, settings), and returns its result
+# Definitions may give an "id" member, otherwise the source is used as the id
+# Runs inside the worker processes, so everything it needs is in its argument
+def evaluate_machine(job: tuple) -> dict:
+    source, text, settings = job
+    result = {"source": source, "id": source}
+    try:
+        data = json.loads(text)
+        result["id"] = str(data.pop("id", source))
+
+        tm = ENGINES[settings["engine"]]()
+        tm.load_data(data)
+        detectors = [CycleDetector(), TranslatedCyclerDetector()] if settings["detect"] else []
+        run = tm.evaluate(settings["max_steps"], settings["max_time"], detectors)
+
+        # Summarise the tape instead of sending all of it back
+        _, pointer, first, tape = tm.configuration()
+        result.update({
+            "outcome": run.outcome,
+            "steps": run.steps,
+            "period": run.period,
+            "state": run.state,
+            "head": pointer,
+            "tape": {
+                "first": first,
+                "length": len(tape),
+                "non_blank": sum(symbol != data["blank"] for symbol in tm.get_tape(first, first + len(tape) - 1))
+            },
+            "elapsed": run.elapsed
+        })
+    except (ValueError, TypeError, KeyError) as error:
+        # Invalid definitions are reported, not fatal
+        result.update({"outcome": "invalid", "error": str(error)})
+
+    return result
+
+
+# Runs every machine from a source across a process pool, appending results to a
+# JSONL file; machines already in that file are skipped, so interrupted runs resume
+# Returns the number of machines run and the total steps they took
+def run_batch(source: str, output: str, settings: dict, processes: int = None, chunksize: int = 16) -> tuple[int, int]:
+    finished = finished_sources(output)
+    jobs = ((name, text, settings) for name, text in read_machines(source) if name not in finished)
+
+    start, machines, steps = time.perf_counter(), 0, 0
+    with Pool(processes) as pool, open(output, "a") as file:
+        for result in pool.imap_unordered(evaluate_machine, jobs, chunksize):
+            # Results are written as soon as they arrive, one line each
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+
+            machines += 1
+            steps += result.get("steps", 0)
+            if machines % REPORT_INTERVAL == 0:
+                report(machines, steps, time.perf_counter() - start)
+
+    report(machines, steps, time.perf_counter() - start)
+    return machines, steps
+
+
+# Prints throughput metrics to stderr, keeping stdout free
+def report(machines: int, steps: int, elapsed: float) -> None:
+    elapsed = max(elapsed, 1e-9)
+    print(f"{machines} machines, {steps} steps in {elapsed:.1f}s "
+          f"({machines / elapsed:.1f} machines/s, {steps / elapsed:.0f} steps/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs many Turing machines in parallel, streaming the results as JSONL")
+    parser.add_argument("source", help="directory of .json machines, or JSONL file with one machine per line (- for stdin)")
+    parser.add_argument("output", help="JSONL results file, appended to; machines already in it are skipped")
+    parser.add_argument("--max-steps", type=int, default=1000000, help="step budget for every machine")
+    parser.add_argument("--max-time", type=float, default=None, help="time budget for every machine, in seconds")
+    parser.add_argument("--engine", choices=ENGINES.keys(), default="fast", help="Turing machine engine to use")
+    parser.add_argument("--no-detect", action="store_true", help="don't look for cycling machines")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes, all CPUs by default")
+    parser.add_argument("--chunksize", type=int, default=16, help="machines sent to a worker at once")
+    arguments = parser.parse_args()
+
+    settings = {
+        "engine": arguments.engine,
+        "max_steps": arguments.max_steps,
+        "max_time": arguments.max_time,
+        "detect": not arguments.no_detect
+    }
+    run_batch(arguments.source, arguments.output, settings, arguments.processes, arguments.chunksize)
@@ -0,0 +1,85 @@
+import random
+import time
+from grammar.cfg import CFG
+
+# Get the Python file's path in order to address relative to it
+PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
+
+# String lengths to benchmark, and how many strings of each length
+LENGTHS = [8, 32, 64]
+STRING_COUNT = 3
+
+# Returns a CFG with the given data
+def make_grammar(data: dict) -> CFG:
+    cfg = CFG()
+    cfg.data = data
+    return cfg
+
+
+# Returns a random balanced string of parentheses of length n (n even)
+def balanced(n: int) -> str:
+    symbols, depth = [], 0
+    for index in range(n):
+        if depth > 0 and (random.random() < 0.5 or depth == n - index):
+            symbols.append(")")
+            depth -= 1
+        else:
+            symbols.append("(")
+            depth += 1
+    return "".join(symbols)
+
+
+# Returns a random arithmetic expression of length about n
+def expression(n: int) -> str:
+    if n <= 2:
+        return "a"
+    if random.random() < 0.2:
+        return "(" + expression(n - 2) + ")"
+    split = random.randint(1, n - 2)
+    return expression(split) + random.choice("+*") + expression(n - split - 1)
+
+
+# Returns a random CNF grammar with many variables and four binary productions per variable
+def random_cnf(variables: int) -> dict:
+    names = [chr(ord("A") + index) for index in range(variables)]
+    productions = [{"from": name, "to": random.choice("ab")} for name in names]
+    productions += [{"from": random.choice(names), "to": random.choice(names) + random.choice(names)}
+                    for _ in range(4 * variables)]
+    return {"variables": names, "terminals": ["a", "b"], "productions": productions}
+
+
+random.seed(0)
+GRAMMARS = [
+    ("cfg.json (CNF, regular)", CFG(PATH + "tests/cfg/cfg.json"), lambda n: "b" * (n - 2) + "ab"),
+    ("balanced parentheses", make_grammar({
+        "variables": ["S"], "terminals": ["(", ")"],
+        "productions": [{"from": "S", "to": "(S)S"}, {"from": "S", "to": ""}]
+    }), balanced),
+    ("arithmetic expressions", make_grammar({
+        "variables": ["E", "T", "F"], "terminals": ["a", "+", "*", "(", ")"],
+        "productions": [{"from": "E", "to": "E+T"}, {"from": "E", "to": "T"}, {"from": "T", "to": "T*F"},
+                        {"from": "T", "to": "F"}, {"from": "F", "to": "(E)"}, {"from": "F", "to": "a"}]
+    }), expression),
+    ("ambiguous (S -> SS | a)", make_grammar({
+        "variables": ["S"], "terminals": ["a"],
+        "productions": [{"from": "S", "to": "SS"}, {"from": "S", "to": "a"}]
+    }), lambda n: "a" * n),
+    ("random CNF, 20 variables", make_grammar(random_cnf(20)), lambda n: "".join(random.choices("ab", k=n)))
+]
+
+for label, cfg, make_string in GRAMMARS:
+    print(f"{label}:")
+    for n in LENGTHS:
+        strings = [make_string(n) for _ in range(STRING_COUNT)]
+        timings = []
+        for engine in ["cyk", "earley", "auto"]:
+            # Build everything the engine needs before timing it
+            cfg.accepts("", engine)
+            start = time.perf_counter()
+            results = [cfg.accepts(string, engine) for string in strings]
+            timings.append(f"{engine} {(time.perf_counter() - start) / STRING_COUNT * 1000:.2f}ms")
+            # All engines have to agree
+            if engine == "cyk":
+                expected = results
+            assert results == expected
+        print(f"    length {n}: " + ", ".join(timings))
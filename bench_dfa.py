@@ -0,0 +1,50 @@
+import random
+import time
+from automata.dfa import DFA
+
+# Get the Python file's path in order to address relative to it
+PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
+
+# Benchmark settings: how many inputs to classify, and how long they may be
+INPUT_COUNT = 5000
+MIN_LENGTH, MAX_LENGTH = 50, 200
+
+# Returns the time taken by a function call and its result
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+# Runs every input through the DFA one symbol at a time, like the demos do
+def loop_action_sequence(dfa: DFA, inputs: list) -> list[bool]:
+    results = []
+    for symbols in inputs:
+        dfa.starting_state()
+        results.append(dfa.action_sequence(symbols))
+    return results
+
+
+for filename in ["tests/dfa/dfa_example.json", "tests/dfa/large_game.json"]:
+    dfa = DFA(PATH + filename)
+    dfa.compile()
+
+    # Random inputs of varying lengths over the DFA's alphabet
+    random.seed(0)
+    inputs = [random.choices(dfa.data["symbols"], k=random.randint(MIN_LENGTH, MAX_LENGTH))
+              for _ in range(INPUT_COUNT)]
+    # Single-character alphabets can be given plain strings as inputs
+    if all(len(symbol) == 1 for symbol in dfa.data["symbols"]):
+        inputs = ["".join(symbols) for symbols in inputs]
+
+    loop_time, expected = timed(loop_action_sequence, dfa, inputs)
+    many_time, (accepted, _) = timed(dfa.run_many, inputs)
+    lockstep_time, vector = timed(dfa.run_lockstep, inputs)
+
+    # All three ways of running the inputs have to agree
+    assert expected == accepted == vector.tolist()
+
+    print(f"{filename} ({len(dfa.data["states"])} states, {INPUT_COUNT} inputs):")
+    print(f"    action_sequence loop: {loop_time:.3f}s")
+    print(f"    run_many:             {many_time:.3f}s ({loop_time / many_time:.1f}x)")
+    print(f"    run_lockstep:         {lockstep_time:.3f}s ({loop_time / lockstep_time:.1f}x)")
@@ -0,0 +1,39 @@
+import numpy as np
+import os
+import tempfile
+import time
+from matrices.matrix import (load_matrix, save_matrix, stream_matrix, load_binary_matrix,
+                             save_binary_matrix, text_to_binary, binary_to_text)
+
+# Size of the benchmarked matrix
+M, N = 2000, 2000
+
+# Runs a function, printing how long it took, and returns its result
+def timed(label: str, function, *arguments):
+    start = time.perf_counter()
+    result = function(*arguments)
+    print(f"{label}: {(time.perf_counter() - start) * 1000:.1f}ms")
+    return result
+
+
+A = np.random.default_rng(0).integers(-10 ** 6, 10 ** 6, (M, N))
+rows = A.tolist()
+
+with tempfile.TemporaryDirectory() as directory:
+    text, binary = os.path.join(directory, "matrix.in"), os.path.join(directory, "matrix.bin")
+    print(f"{M} by {N} matrix:")
+
+    timed("save_matrix (text)", save_matrix, rows, text)
+    timed("save_binary_matrix", save_binary_matrix, A, binary)
+    print(f"text file {os.path.getsize(text)} bytes, binary file {os.path.getsize(binary)} bytes")
+
+    assert timed("load_matrix (text)", load_matrix, text)[2] == rows
+    assert (timed("stream_matrix (text)", stream_matrix, text)[2] == A).all()
+    assert (timed("load_binary_matrix, read", load_binary_matrix, binary, False)[2] == A).all()
+    _, _, mapped = timed("load_binary_matrix, memory-mapped", load_binary_matrix, binary)
+    assert (timed("slicing 10 rows of the memory-mapped matrix", lambda: np.array(mapped[M // 2:M // 2 + 10])) == A[M // 2:M // 2 + 10]).all()
+    del mapped
+
+    timed("text_to_binary", text_to_binary, text, binary)
+    timed("binary_to_text", binary_to_text, binary, text)
+    assert load_matrix(text)[2] == rows
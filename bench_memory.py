@@ -0,0 +1,34 @@
+import json
+import random
+import time
+from automata.dfa import DFA
+from automata.interned import deep_size
+
+# Get the Python file's path in order to address relative to it
+PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
+
+# Inputs run through the DFA before and after compacting it
+INPUT_COUNT, INPUT_LENGTH = 200, 100
+
+for filename in ["tests/dfa/small_game.json", "tests/dfa/large_game.json"]:
+    with open(PATH + filename, "r") as file:
+        raw = json.load(file)
+    dfa = DFA(PATH + filename)
+
+    random.seed(0)
+    inputs = [random.choices(dfa.data["symbols"], k=INPUT_LENGTH) for _ in range(INPUT_COUNT)]
+    start = time.perf_counter()
+    results = [(dfa.starting_state(), dfa.action_sequence(symbols))[1] for symbols in inputs]
+    elapsed = time.perf_counter() - start
+
+    print(f"{filename}:")
+    print(f"    parsed JSON: {deep_size(raw)} bytes")
+    print(f"    definition with interned form: {deep_size(dfa.data) + deep_size(dfa.interned)} bytes")
+    dfa.compact()
+    print(f"    interned form only, after compact(): {deep_size(dfa.interned)} bytes")
+
+    # Running inputs only needs the interned form
+    start = time.perf_counter()
+    assert results == [(dfa.starting_state(), dfa.action_sequence(symbols))[1] for symbols in inputs]
+    print(f"    running {INPUT_COUNT} inputs: {elapsed * 1000:.1f}ms before compacting, "
+          f"{(time.perf_counter() - start) * 1000:.1f}ms after")
@@ -0,0 +1,35 @@
+import random
+import time
+from automata.dfa import DFA
+from automata.minimize import size_report
+
+# Get the Python file's path in order to address relative to it
+PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
+
+# Throughput is measured by classifying this many random inputs of this length
+INPUT_COUNT, INPUT_LENGTH = 2000, 100
+
+# Returns how many symbols per second a DFA classifies with run_many
+def throughput(dfa: DFA, inputs: list[list[str]]) -> float:
+    dfa.compile()
+    start = time.perf_counter()
+    dfa.run_many(inputs)
+    return INPUT_COUNT * INPUT_LENGTH / (time.perf_counter() - start)
+
+
+for filename in ["tests/dfa/dfa_example.json", "tests/dfa/small_game.json", "tests/dfa/large_game.json"]:
+    dfa = DFA(PATH + filename)
+    minimal = dfa.minimize()
+
+    random.seed(0)
+    inputs = [random.choices(dfa.data["symbols"], k=INPUT_LENGTH) for _ in range(INPUT_COUNT)]
+
+    # The minimal DFA has to accept exactly the same inputs
+    assert dfa.run_many(inputs)[0] == minimal.run_many(inputs)[0]
+
+    print(f"{filename}:")
+    for label, automaton in [("original", dfa), ("minimal", minimal)]:
+        report = size_report(automaton.data)
+        print(f"    {label}: {report["states"]} states, {report["rules"]} rules, "
+              f"{report["json_bytes"]} JSON bytes, {report["table_bytes"]} table bytes, "
+              f"{throughput(automaton, inputs):.0f} symbols/s")
@@ -0,0 +1,64 @@
+import random
+import time
+from automata.dfa import DFA
+from automata.product import ProductAutomaton
+
+# Benchmark settings: how many patterns to look for, how long they are, and the inputs to check
+PATTERN_COUNT, PATTERN_LENGTH = 30, 4
+INPUT_COUNT, INPUT_LENGTH = 500, 200
+SYMBOLS = ["a", "b", "c", "d"]
+
+# Returns a DFA accepting the inputs that end with a pattern, through the usual prefix-function
+# construction: state i means the last i symbols match the start of the pattern
+# Run symbol by symbol, it is in an accepting state right after every occurrence of the pattern
+def suffix_dfa(pattern: str) -> DFA:
+    states = [str(length) for length in range(len(pattern) + 1)]
+    ruleset = dict()
+    for length in range(len(pattern) + 1):
+        ruleset[states[length]] = dict()
+        for symbol in SYMBOLS:
+            # Longest suffix of what was read that is a prefix of the pattern
+            text = pattern[:length] + symbol
+            next_length = max(size for size in range(min(len(text), len(pattern)) + 1)
+                              if pattern.startswith(text[len(text) - size:]))
+            ruleset[states[length]][symbol] = states[next_length]
+
+    dfa = DFA()
+    dfa.load_data({"states": states, "accepting": [states[-1]], "initial": states[0],
+                   "symbols": SYMBOLS, "ruleset": ruleset})
+    return dfa
+
+
+random.seed(0)
+patterns = ["".join(random.choices(SYMBOLS, k=PATTERN_LENGTH)) for _ in range(PATTERN_COUNT)]
+automata = [suffix_dfa(pattern) for pattern in patterns]
+inputs = [random.choices(SYMBOLS, k=INPUT_LENGTH) for _ in range(INPUT_COUNT)]
+
+# Every automaton reading every input on its own
+start = time.perf_counter()
+expected = []
+for symbols in inputs:
+    matches = []
+    for index, dfa in enumerate(automata):
+        dfa.starting_state()
+        if dfa.action_sequence(symbols):
+            matches.append(index)
+    expected.append(matches)
+separate_time = time.perf_counter() - start
+
+# A single pass through the product, built while running
+product = ProductAutomaton(automata)
+start = time.perf_counter()
+cold = product.run_many(inputs)
+cold_time = time.perf_counter() - start
+start = time.perf_counter()
+warm = product.run_many(inputs)
+warm_time = time.perf_counter() - start
+
+assert expected == cold == warm
+stats = product.stats()
+print(f"{PATTERN_COUNT} patterns of length {PATTERN_LENGTH}, {INPUT_COUNT} inputs of length {INPUT_LENGTH}:")
+print(f"    separate action_sequence runs: {separate_time:.3f}s")
+print(f"    product, building states:      {cold_time:.3f}s ({separate_time / cold_time:.1f}x)")
+print(f"    product, states already built: {warm_time:.3f}s ({separate_time / warm_time:.1f}x)")
+print(f"    {stats["states"]} product states, {stats["transitions"]} transitions")
@@ -0,0 +1,41 @@
+import random
+import tempfile
+import time
+from automata.dfa import DFA
+
+# Get the Python file's path in order to address relative to it
+PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
+
+# Size of the scanned input, in bytes
+INPUT_SIZE = 10 << 20
+
+dfa = DFA(PATH + "tests/dfa/dfa_example.json")
+random.seed(0)
+text = "".join(random.choices(dfa.data["symbols"], k=INPUT_SIZE))
+
+with tempfile.TemporaryDirectory() as directory:
+    filename = directory + "/input.txt"
+    with open(filename, "w") as file:
+        file.write(text)
+
+    # The old way: turning the whole input into a list of one-character strings
+    start = time.perf_counter()
+    dfa.starting_state()
+    expected = dfa.action_sequence(list(text))
+    sequence_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accepted = dfa.scan(filename)
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with open(filename, "rb") as file:
+        offsets = dfa.scan(file, report=True)
+    report_time = time.perf_counter() - start
+
+    assert accepted == expected and (offsets[-1:] == [INPUT_SIZE]) == expected
+
+print(f"Scanning {INPUT_SIZE >> 20}MB through tests/dfa/dfa_example.json:")
+print(f"    action_sequence on a list: {sequence_time:.3f}s")
+print(f"    scan of the mapped file:   {scan_time:.3f}s ({sequence_time / scan_time:.1f}x)")
+print(f"    every accepting offset:    {report_time:.3f}s ({len(offsets)} offsets)")
@@ -0,0 +1,63 @@
+import time
+from automata.turing import TM
+from automata.fastturing import FastTM
+from automata.macroturing import MacroTM
+
+# Get the Python file's path in order to address relative to it
+PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
+
+# Step budget for the runs below
+MAX_STEPS = 200000
+# Block size used for the macro machine
+BLOCK_SIZE = 3
+
+# The 5-state busy beaver champion, which halts after 47176870 steps
+# Each row is (state, symbol read, symbol written, shift, next state)
+BEAVER_5 = [
+    ("A", "0", "1", "R", "B"), ("A", "1", "1", "L", "C"),
+    ("B", "0", "1", "R", "C"), ("B", "1", "1", "R", "B"),
+    ("C", "0", "1", "R", "D"), ("C", "1", "0", "L", "E"),
+    ("D", "0", "1", "L", "A"), ("D", "1", "1", "L", "D"),
+    ("E", "0", "1", "R", "H"), ("E", "1", "0", "L", "A")
+]
+
+# Builds a TM's data from a list of rule rows
+def machine_data(rows: list[tuple]) -> dict:
+    return {
+        "symbols": ["0", "1"],
+        "states": sorted({row[0] for row in rows} | {row[4] for row in rows}),
+        "blank": "0",
+        "accepting": ["H"],
+        "initial": "A",
+        "increment": "R",
+        "decrement": "L",
+        "ruleset": [{"old_state": state, "old_tape": read, "new_state": next_state, "new_tape": write, "shift": shift}
+                    for state, read, write, shift, next_state in rows]
+    }
+
+
+# Loads a machine into both engines, runs them and compares the results
+def compare(label: str, load) -> None:
+    results = []
+    for tm in [TM(), FastTM(), MacroTM(block_size=BLOCK_SIZE)]:
+        load(tm)
+        start = time.perf_counter()
+        steps, halted = tm.run(MAX_STEPS)
+        elapsed = time.perf_counter() - start
+        results.append((steps, halted, tm.state, tm.tape_pointer, tm.get_tape(-100, 100)))
+        print(f"{label}, {type(tm).__name__}: {steps} steps, halted: {halted}, {elapsed:.3f}s ({steps / elapsed:.0f} steps/s)")
+
+    # All engines have to end up in exactly the same configuration
+    assert all(result == results[0] for result in results)
+
+
+compare("beaver.json", lambda tm: tm.load_automata(PATH + "tests/turing/beaver.json"))
+compare("5-state beaver", lambda tm: tm.load_data(machine_data(BEAVER_5)))
+
+# The macro machine can also run the 5-state beaver all the way until it halts
+tm = MacroTM(block_size=BLOCK_SIZE)
+tm.load_data(machine_data(BEAVER_5))
+start = time.perf_counter()
+steps, halted = tm.run(10 ** 9)
+print(f"5-state beaver, MacroTM until halting: {steps} steps, halted: {halted}, "
+      f"{time.perf_counter() - start:.3f}s, {tm.get_tape(-20000, 20000).count("1")} ones on the tape")
@@ -0,0 +1,34 @@
+import json
+import time
+from automata.checks.typecheck import assert_dictionary_types, DFA_TYPES
+from automata.checks.valuecheck import DFA_VALIDATORS
+from automata.checks.validator import validate
+from automata.dfa import DFA
+
+# Get the Python file's path in order to address relative to it
+PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
+FILENAME = PATH + "tests/dfa/large_game.json"
+
+# Runs a function, printing how long it took
+def timed(label: str, function, *arguments) -> None:
+    start = time.perf_counter()
+    function(*arguments)
+    print(f"{label}: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+# Validation through the separate type and value checks, one check at a time
+def separate_checks(data: dict) -> None:
+    assert_dictionary_types(data, DFA_TYPES)
+    for check in DFA_VALIDATORS:
+        check(data)
+
+
+with open(FILENAME, "r") as file:
+    data = json.load(file)
+print(f"{FILENAME}: {len(data["states"])} states, {sum(map(len, data["ruleset"].values()))} rules")
+
+timed("separate type and value checks", separate_checks, data)
+timed("single-pass validation", validate, "DFA", data)
+timed("loading, validated", DFA().load_automata, FILENAME)
+timed("loading again, already validated", DFA().load_automata, FILENAME)
+timed("loading, without validation", DFA().load_automata, FILENAME, False)
@@ -0,0 +1,29 @@
+import argparse
+from automata.dfa import DFA
+from automata.nfa import NFA
+from automata.turing import TM
+
+# Kinds of automata that can be converted
+KINDS = {"dfa": DFA, "nfa": NFA, "tm": TM}
+
+
+# Converts an automaton between the JSON format and the binary one, in the direction
+# given by the input's extension: .json files are converted to binary, anything else to JSON
+# The automaton is validated once while converting, so binary files load without validation
+def convert(kind: str, source: str, target: str) -> None:
+    automaton = KINDS[kind]()
+    if source.endswith(".json"):
+        automaton.load_automata(source)
+        automaton.save(target)
+    else:
+        automaton.load(source)
+        automaton.save_automata(target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converts automata between the JSON and binary formats")
+    parser.add_argument("kind", choices=KINDS.keys(), help="kind of automaton")
+    parser.add_argument("source", help=".json file to convert to binary, or binary file to convert to JSON")
+    parser.add_argument("target", help="file to write the converted automaton to")
+    arguments = parser.parse_args()
+    convert(arguments.kind, arguments.source, arguments.target)
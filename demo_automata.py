@@ -34,4 +34,21 @@ print("NFA tests:")
 for test in deepcopy(TESTS):
     nfa.starting_state()
     result = nfa.action_sequence(test)
-    print(f"Final state: {nfa.state}, accepting: {result}")
\ No newline at end of file
+    print(f"Final state: {nfa.state}, accepting: {result}")
+
+# Rules can be changed in place through data, even after the automata have run,
+# as long as invalidate() is called afterwards
+# Should output True for both automata
+dfa.starting_state()
+dfa.action("0")
+dfa.data["ruleset"]["000"]["0"] = "100"
+dfa.invalidate()
+dfa.action("0")
+print(f"DFA follows the changed rule: {dfa.accepting()}")
+
+nfa.starting_state()
+nfa.action("0")
+nfa.data["ruleset"]["Q4"]["0"] = ["Q2"]
+nfa.invalidate()
+nfa.action("0")
+print(f"NFA follows the changed rule: {nfa.accepting()}")
\ No newline at end of file
@@ -12,3 +12,16 @@ cfg = CFG(PATH + "tests/cfg/cfg.json")
 print(cfg.match_string("bbbab") is not None)
 # Should fail, i.e output False
 print(cfg.match_string("bbabb") is not None)
+
+# A grammar where S has 256 binary productions, all of them matching "aa"
+wide = CFG(PATH + "tests/cfg/wide_cfg.json")
+# Should match, i.e. output True
+print(wide.match_string("aa") is not None)
+
+# A grammar for a*, whose start variable gives the empty string but also appears
+# on right sides, so it isn't in CNF and accepts() has to convert it first
+nullable = CFG(PATH + "tests/cfg/nullable_cfg.json")
+# Should match with both engines, i.e. output True True
+print(nullable.accepts("a", engine="cyk"), nullable.accepts("aaa", engine="auto"))
+# Should match the empty string too, i.e. output True
+print(nullable.accepts("", engine="cyk"))
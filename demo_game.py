@@ -1,8 +1,6 @@
 import json
 from automata.dfa import DFA
-
-INVENTORY_DELIMITER = "__"
-ITEM_DELIMITER = "%"
+from game.lazygame import LazyGame, INVENTORY_DELIMITER, ITEM_DELIMITER
 
 # Loads JSON data from a gamedescribe file
 def load_description(filename: str) -> dict:
@@ -11,6 +9,8 @@ def load_description(filename: str) -> dict:
 
 
 # Creates a DFA from gamedescribe data
+# Every room and inventory combination becomes a state, see LazyGame
+# for an engine that only explores the reachable ones, when needed
 def make_DFA(data: dict) -> DFA:
 
     # Returns all subsets of a set
@@ -122,17 +122,19 @@ def make_DFA(data: dict) -> DFA:
     return game
 
 
-# Get the Python file's path in order to address relative to it
-PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
-# Get the data from a gamedescribe .json file
-data = load_description("gamedescribe/small_game.json")
-# Make the DFA for the described game
-game = make_DFA(data)
-# Save it to the DFA tests directory for later use
-game.save_automata("tests/dfa/small_game.json")
-
-# Now let's play!
-while not game.accepting():
-    symbol = input("What to do: ").strip()
-    game.action(symbol)
-    print(f"State: {game.state}")
+if __name__ == "__main__":
+    # Get the Python file's path in order to address relative to it
+    PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
+    # Get the data from a gamedescribe .json file
+    data = load_description(PATH + "gamedescribe/small_game.json")
+    # Make a lazy engine for the described game, its states are computed as they are reached
+    game = LazyGame(data)
+    # Save the reachable part of its DFA to the DFA tests directory for later use,
+    # next to the full DFA of make_DFA in small_game.json
+    game.to_dfa().save_automata(PATH + "tests/dfa/small_game_reachable.json")
+
+    # Now let's play!
+    while not game.accepting():
+        symbol = input("What to do: ").strip()
+        game.action(symbol)
+        print(f"State: {game.state}")
@@ -1,4 +1,5 @@
 from automata.turing import TM
+from automata.termination import CycleDetector, TranslatedCyclerDetector
 
 # Get the Python file's path in order to address relative to it
 PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
@@ -7,10 +8,9 @@ PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
 tm = TM(PATH + "tests/turing/beaver.json")
 
 # Let's run it until it halts, and count how many steps it took
-steps = 0
-while not tm.accepting():
-    steps += 1
-    tm.action()
+# The run is bounded, so machines that never halt (or halt without
+# accepting) can't keep us waiting forever
+result = tm.evaluate(max_steps=1000000, max_time=10.0, detectors=[CycleDetector(), TranslatedCyclerDetector()])
 
 # Print the result
-print(f"The busy beaver finished in {steps} steps")
\ No newline at end of file
+print(f"The busy beaver finished in {result.steps} steps ({result.outcome})")
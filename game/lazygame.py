@@ -0,0 +1,142 @@
+from automata.basicautomaton import BasicAutomaton
+from automata.dfa import DFA
+from typing import override
+
+INVENTORY_DELIMITER = "__"
+ITEM_DELIMITER = "%"
+
+# Runs a described game like the DFA built by demo_game.make_DFA, without building it
+# A state is a (room, inventory) pair, where the inventory is a bitmask over the items
+# Transitions are computed when first needed, so only reachable states are ever explored
+class LazyGame(BasicAutomaton):
+
+    # Indexes the gamedescribe data by (room, action)
+    def __init__(self, data: dict):
+        super().__init__()
+        self.description = data
+
+        # Every item gets a bit in the inventory mask
+        self.items = list(data["items"])
+        self.item_bits = {item: 1 << index for index, item in enumerate(self.items)}
+
+        self.symbols = list(data["actions"])
+        self.win = set(data["win"])
+
+        # Candidate rules for each (room, action), as (required, lost, gained, new room)
+        # make_DFA lets later rules overwrite earlier ones, moves first and gets second,
+        # so candidates are stored in reverse and the first one that applies is used
+        self.rules = dict()
+        for move in data["moves"]:
+            self.rules.setdefault((move["from"], move["on"]), []).insert(
+                0, (self.mask(move["if"]), 0, 0, move["to"])
+            )
+        for get in data["gets"]:
+            self.rules.setdefault((get["where"], data["bind"]), []).insert(
+                0, (self.mask(get["if"]), self.mask(get["loses"]), self.mask(get["gains"]), get["where"])
+            )
+
+        # Transitions computed so far, and the names given to states
+        self.transitions = dict()
+        self.names = dict()
+
+        self.starting_state()
+
+
+    # Returns the inventory mask of a list of items
+    def mask(self, items: list[str]) -> int:
+        inventory = 0
+        for item in items:
+            if item not in self.item_bits:
+                raise ValueError(f"Item {item} is not in the item list")
+            inventory |= self.item_bits[item]
+        return inventory
+
+
+    # Returns the label of a state, in the same format as make_DFA
+    def state_name(self, state: tuple[str, int]) -> str:
+        name = self.names.get(state)
+        if name is None:
+            room, inventory = state
+            items = sorted(item for item in self.items if inventory & self.item_bits[item])
+            # On an empty inventory, the label is just the room
+            name = room if items == [] else room + INVENTORY_DELIMITER + ITEM_DELIMITER.join(items)
+            self.names[state] = name
+        return name
+
+
+    # Puts the game in its starting room, with an empty inventory
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def starting_state(self) -> None:
+        self.current = (self.description["start"], 0)
+
+
+    # Returns True if the player is in a winning room
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def accepting(self) -> bool:
+        return self.current[0] in self.win
+
+
+    # The current state's label
+    @property
+    def state(self) -> str:
+        return self.state_name(self.current)
+
+
+    # Returns the state reached from a state on an action, or None if no rule applies
+    def transition(self, state: tuple[str, int], symbol: str) -> tuple[str, int] | None:
+        key = (state, symbol)
+        if key in self.transitions:
+            return self.transitions[key]
+
+        room, inventory = state
+        next_state = None
+        for required, lost, gained, new_room in self.rules.get((room, symbol), []):
+            if inventory & required == required:
+                next_state = (new_room, inventory & ~lost | gained)
+                break
+
+        self.transitions[key] = next_state
+        return next_state
+
+
+    # Performs an action, staying in place if no rule applies
+    # Implements an abstract method from BasicAutomaton
+    @override
+    def action(self, symbol: str) -> None:
+        if symbol not in self.symbols:
+            raise ValueError(f"Symbol {symbol} not recognized")
+
+        next_state = self.transition(self.current, symbol)
+        if next_state is not None:
+            self.current = next_state
+
+
+    # Exports the reachable part of the game as a DFA, with make_DFA's state labels
+    def to_dfa(self) -> DFA:
+        initial = (self.description["start"], 0)
+        order, seen, ruleset = [initial], {initial}, dict()
+
+        # Breadth-first search through the reachable states
+        for state in order:
+            action = ruleset[self.state_name(state)] = dict()
+            for symbol in self.symbols:
+                next_state = self.transition(state, symbol)
+                if next_state is None:
+                    continue
+                action[symbol] = self.state_name(next_state)
+                if next_state not in seen:
+                    seen.add(next_state)
+                    order.append(next_state)
+
+        game = DFA()
+        game.data = {
+            "states": [self.state_name(state) for state in order],
+            "accepting": [self.state_name(state) for state in order if state[0] in self.win],
+            "initial": self.state_name(initial),
+            "symbols": list(self.symbols),
+            "ruleset": ruleset
+        }
+        game.starting_state()
+        return game
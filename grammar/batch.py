@@ -0,0 +1,71 @@
+import time
+from grammar.compiled import CompiledGrammar
+from multiprocessing import Pool
+
+# The memo of span variable sets stops growing at this many entries, and is cleared
+# before the next string once it is full
+MEMO_LIMIT = 1000000
+
+# Grammar compiled once in each worker process, by start_worker
+worker_grammar = None
+worker_memo = dict()
+
+
+# Compiles the grammar in a worker process
+def start_worker(data: dict) -> None:
+    global worker_grammar
+    worker_grammar = CompiledGrammar(data)
+
+
+# Recognizes strings with a grammar, sharing a memo of substring variable sets
+# Returns whether each string is produced by the start variable, and the memo's hits and misses
+def recognize_all(grammar: CompiledGrammar, strings: list[str], memo: dict) -> tuple[list[bool], int, int]:
+    accepted, hits, misses = [], 0, 0
+    for string in strings:
+        if len(memo) >= MEMO_LIMIT:
+            memo.clear()
+        produced, string_hits, string_misses = grammar.variable_set(string, memo, MEMO_LIMIT)
+        # The start variable is the first one
+        accepted.append(len(string) > 0 and produced & 1 == 1)
+        hits, misses = hits + string_hits, misses + string_misses
+    return accepted, hits, misses
+
+
+# Recognizes a chunk of strings in a worker process
+def recognize_chunk(strings: list[str]) -> tuple[list[bool], int, int]:
+    return recognize_all(worker_grammar, strings, worker_memo)
+
+
+# Checks which strings a CNF grammar produces, compiling it once
+# Identical strings are only checked once, and strings are checked in sorted order,
+# so that ones sharing prefixes are close together and reuse each other's memo entries
+# With processes set, chunks of strings are checked in that many worker processes
+# Returns whether each string is accepted, and statistics about the run
+def match_many(data: dict, strings: list[str], processes: int = None, chunksize: int = 256) -> tuple[list[bool], dict]:
+    start = time.perf_counter()
+    unique = sorted(set(strings))
+
+    if processes is None:
+        accepted, hits, misses = recognize_all(CompiledGrammar(data), unique, dict())
+    else:
+        chunks = [unique[index:index + chunksize] for index in range(0, len(unique), chunksize)]
+        accepted, hits, misses = [], 0, 0
+        with Pool(processes, initializer=start_worker, initargs=(data,)) as pool:
+            for chunk_accepted, chunk_hits, chunk_misses in pool.imap(recognize_chunk, chunks):
+                accepted += chunk_accepted
+                hits, misses = hits + chunk_hits, misses + chunk_misses
+
+    results = dict(zip(unique, accepted))
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    stats = {
+        "strings": len(strings),
+        "unique": len(unique),
+        "accepted": sum(results[string] for string in strings),
+        "memo_hits": hits,
+        "memo_misses": misses,
+        "elapsed": elapsed,
+        "strings_per_second": len(strings) / elapsed,
+        "symbols_per_second": sum(map(len, strings)) / elapsed
+    }
+
+    return [results[string] for string in strings], stats
@@ -1,11 +1,29 @@
 import json
 from collections import defaultdict
+from grammar.batch import match_many
+from grammar.compiled import CompiledGrammar
+from grammar.earley import EarleyParser
+from grammar.forest import ParseForest
+from grammar.normalize import is_cnf, to_cnf
+
+# CNF grammars with at least this many binary productions per variable are dense (or ambiguous)
+# enough for CYK to beat the Earley parser, which is faster on sparse ones, see bench_cfg.py
+CYK_MIN_DENSITY = 1
 
 class CFG:
+
+    # Indexed productions, built on demand by compile()
+    compiled = None
+    # Equivalent grammar in CNF and Earley parser, built on demand by accepts()
+    normalized = None
+    earley = None
+
     # Loads a CFG from a file
     def load_grammar(self, filename: str) -> None:
         with open(filename, "r+") as file:
             self.data = json.load(file)
+        # Drop anything built for previously loaded data
+        self.compiled, self.normalized, self.earley = None, None, None
 
 
     # Saves a CFG to a file
@@ -15,55 +33,107 @@ class CFG:
                 json.dump(self.data, file, indent=4)
 
 
+    # Interns the variables and indexes the productions for the CYK algorithm
+    # Has to be called again if self.data is changed after compiling
+    def compile(self) -> CompiledGrammar:
+        self.compiled = CompiledGrammar(self.data)
+        return self.compiled
+
+
     # Checks whether a string belongs to the CFG, assuming CNF
-    def match_string(self, string: str) -> bool:
-        # Returns a tuple with the arguments, needed for accessing prod/back
-        def at(a: str, b: str, c: str) -> tuple:
-            return tuple([a, b, c])
-
-        # Returns the index of the variable V in the variable list
-        def var(V: str) -> int:
-            return self.data["variables"].index(V) + 1
-
-        # Checks if a production is an unit production
-        def is_unit(production) -> bool:
-            produced = production["to"]
-            # Initial assumption is that it's an unit production
-            unit = True
-            # Check if it is by checking if it has any variables
-            for symbol in produced:
-                if symbol in self.data["variables"]:
-                    unit = False
-            # Return the result
-            return unit
-
-
-        # CYK algorithm implementation
-        back, prod, n = defaultdict(list), defaultdict(lambda: False), len(string)
-
-        for s in range(1, n + 1):
-            for q in self.data["productions"]:
-                if is_unit(q) and q["to"] == string[s - 1]:
-                    v = self.data["variables"].index(q["from"]) + 1
-                    prod[at(1, s, v)] = True
-        
-
-        for l in range(2, n + 1):
-            for s in range(1, n - l + 2):
-                for p in range(1, l):
-                    for q in self.data["productions"]:
-                        if not is_unit(q):
-                            a, b, c = var(q["from"]), var(q["to"][0]), var(q["to"][1])
-                            if prod[at(p, s, b)] and prod[at(l - p, s + p, c)]:
-                                prod[at(l, s, a)] = True
-                                back[at(l, s, a)].append(at(p, b, c))
-
-
-        # Final check
-        if prod[at(n, 1, 1)]:
+    # Returns the CYK back-pointers if it does, None otherwise
+    # Back-pointers map (length, start, variable) to a list of (split, left variable, right variable),
+    # with 1-based lengths, starts, splits and variables (the variable's index in the list, plus one)
+    def match_string(self, string: str) -> dict | None:
+        if self.compiled is None:
+            self.compile()
+
+        # CYK algorithm, on a chart of variable sets for every span
+        back = defaultdict(list)
+        chart = self.compiled.chart(string, back)
+
+        # Final check, the whole string has to be produced by the first variable
+        if len(string) > 0 and chart[len(string), 1, 0]:
             return back
             
 
+    # Returns an equivalent CFG in Chomsky normal form
+    # (a new start variable, lifted terminals, binary productions, no empty or unit productions)
+    def to_cnf(self) -> "CFG":
+        normalized = CFG()
+        normalized.data = to_cnf(self.data)
+        return normalized
+
+
+    # Checks whether a string belongs to the CFG, which doesn't have to be in CNF
+    # engine is "cyk" (on the CFG itself if it is in CNF, or on an equivalent one otherwise),
+    # "earley", or "auto", which uses CYK on dense CNF grammars and Earley otherwise
+    def accepts(self, string: str, engine: str = "auto") -> bool:
+        if engine == "auto":
+            engine = "earley"
+            if is_cnf(self.data):
+                binary = sum(len(production["to"]) == 2 for production in self.data["productions"])
+                if binary >= CYK_MIN_DENSITY * len(self.data["variables"]):
+                    engine = "cyk"
+
+        if engine == "earley":
+            if self.earley is None:
+                self.earley = EarleyParser(self.data)
+            return self.earley.recognize(string)
+
+        if engine != "cyk":
+            raise ValueError(f"Unknown parsing engine {engine}")
+
+        if self.normalized is None:
+            self.normalized = self if is_cnf(self.data) else self.to_cnf()
+            self.normalized.compile()
+
+        # The empty string can only come from an empty production of the start variable
+        if string == "":
+            start = self.normalized.data["variables"][0]
+            return any(production["from"] == start and production["to"] == ""
+                       for production in self.normalized.data["productions"])
+        return bool(self.normalized.compiled.chart(string)[len(string), 1, 0])
+
+
+    # Returns the shared packed parse forest of a string (see grammar/forest.py),
+    # or None if the string doesn't belong to the CFG, assuming CNF
+    # Unlike match_string, the chart is built without back-pointers, and only the
+    # nodes reachable from the whole string's start variable are added to the forest
+    def parse_forest(self, string: str) -> ParseForest | None:
+        if self.compiled is None:
+            self.compile()
+
+        chart = self.compiled.chart(string)
+        if len(string) > 0 and chart[len(string), 1, 0]:
+            return ParseForest(self.compiled, string, chart)
+
+
+    # Returns a parse tree for a string, or None if the string doesn't belong to the CFG
+    # Trees are nested lists, [variable, left subtree, right subtree] or [variable, terminal]
+    # Every parse tree can be found with parse_forest(string).trees(), and counted with count()
+    def parse_tree(self, string: str) -> list | None:
+        forest = self.parse_forest(string)
+        if forest is None:
+            return None
+        return next(forest.trees())
+
+
+    # Checks a batch of strings at once, compiling the grammar only once, checking
+    # repeated strings once and sharing work between strings with common substrings
+    # With processes set, the strings are checked in that many worker processes
+    # Returns whether each string is accepted, their parse trees if trees is set
+    # (None for the strings that aren't accepted), and throughput statistics
+    def match_many(self, strings: list[str], processes: int = None, trees: bool = False) -> tuple[list[bool], list | None, dict]:
+        accepted, stats = match_many(self.data, strings, processes)
+        if not trees:
+            return accepted, None, stats
+
+        # Trees are only built for accepted strings, and only once for each of them
+        built = {string: self.parse_tree(string) for string, result in zip(strings, accepted) if result}
+        return accepted, [built.get(string) for string in strings], stats
+
+
     # CFG constructor, can load from a .json file
     def __init__(self, filename: str = None):
         # Load from a .json, if any was given
@@ -0,0 +1,154 @@
+import numpy as np
+
+# Longest spans whose variable sets are kept in the memo of variable_set: longer substrings
+# rarely repeat, and keeping them all would take memory quadratic in the string's length
+MEMO_SPAN = 32
+# Strings longer than this are recognized with the NumPy chart rather than span by span
+CHART_LENGTH = 128
+
+# Integer-indexed form of a CFG in Chomsky normal form, built once from its data
+# Variables are interned into ids, in the order of the variable list
+class CompiledGrammar:
+
+    # Indexes the productions: unit ones by terminal, binary ones by right-hand pair
+    def __init__(self, data: dict):
+        self.variables = list(data["variables"])
+        self.variable_ids = {variable: index for index, variable in enumerate(self.variables)}
+
+        # For every terminal, the set of variables producing it, as a boolean vector
+        self.terminals = dict()
+        # Binary productions A -> BC, as three parallel arrays, in the order they were given
+        heads, lefts, rights = [], [], []
+
+        for production in data["productions"]:
+            produced = production["to"]
+            # A production without variables on its right side is an unit production
+            if not any(symbol in self.variable_ids for symbol in produced):
+                if produced not in self.terminals:
+                    self.terminals[produced] = np.zeros(len(self.variables), dtype=bool)
+                self.terminals[produced][self.variable_ids[production["from"]]] = True
+            elif len(produced) == 2 and all(symbol in self.variable_ids for symbol in produced):
+                heads.append(self.variable_ids[production["from"]])
+                lefts.append(self.variable_ids[produced[0]])
+                rights.append(self.variable_ids[produced[1]])
+            else:
+                raise ValueError(f"Production {production["from"]} -> {produced} is not in Chomsky normal form")
+
+        self.heads = np.array(heads, dtype=np.int32)
+        self.lefts = np.array(lefts, dtype=np.int32)
+        self.rights = np.array(rights, dtype=np.int32)
+        # Indexes of the binary productions of every variable, for building parse forests
+        self.head_productions = [np.flatnonzero(self.heads == index) for index in range(len(self.variables))]
+
+        # Row i has a single 1 in the column of production i's head, so that multiplying
+        # a vector of matched productions with it gives the variables they produce
+        # Counts are 32 bit, so that a variable with many matched productions can't wrap to 0
+        self.head_matrix = np.zeros((len(heads), len(self.variables)), dtype=np.int32)
+        self.head_matrix[np.arange(len(heads)), self.heads] = 1
+
+        # The same indexes with variable sets as integer bitmasks, for recognizing with a memo
+        # Unit productions by terminal, and binary ones by left variable, then right variable
+        self.terminal_masks = {terminal: sum(1 << int(index) for index in np.flatnonzero(variables))
+                               for terminal, variables in self.terminals.items()}
+        self.pairs = dict()
+        for head, left, right in zip(heads, lefts, rights):
+            by_right = self.pairs.setdefault(left, dict())
+            by_right[right] = by_right.get(right, 0) | 1 << head
+
+
+    # Builds the CYK chart for a string, as a boolean array indexed by
+    # (span length, span start, variable id), with 1-based lengths and starts
+    # If back is given, back-pointers are added to it in the same format as CFG.match_string
+    def chart(self, string: str, back: dict = None) -> np.ndarray:
+        n = len(string)
+        chart = np.zeros((n + 1, n + 2, len(self.variables)), dtype=bool)
+        empty = np.zeros(len(self.variables), dtype=bool)
+
+        # Spans of length 1 come from the unit productions
+        for s in range(1, n + 1):
+            chart[1, s] = self.terminals.get(string[s - 1], empty)
+
+        # Longer spans combine every split of every start at once
+        for l in range(2, n + 1):
+            starts = np.arange(1, n - l + 2)[:, np.newaxis]
+            splits = np.arange(1, l)[np.newaxis, :]
+
+            # Variable sets of the left and right parts, indexed by (start, split, variable)
+            left = chart[splits, starts]
+            right = chart[l - splits, starts + splits]
+
+            # Productions matched for every start and split
+            hits = left[:, :, self.lefts] & right[:, :, self.rights]
+            produced = hits.any(axis=1).astype(np.int32) @ self.head_matrix
+            chart[l, 1:n - l + 2] = produced > 0
+
+            # Matches come out ordered by start, split and production, like the plain loops
+            if back is not None:
+                for start, split, production in zip(*np.nonzero(hits)):
+                    a, b, c = self.heads[production] + 1, self.lefts[production] + 1, self.rights[production] + 1
+                    back[(l, int(start) + 1, int(a))].append((int(split) + 1, int(b), int(c)))
+
+        return chart
+
+
+    # Returns the set of variables producing both of two parts next to each other
+    def combine(self, left: int, right: int) -> int:
+        produced = 0
+        while left:
+            low = left & -left
+            left ^= low
+            for variable, heads in self.pairs.get(low.bit_length() - 1, {}).items():
+                if right >> variable & 1:
+                    produced |= heads
+        return produced
+
+
+    # Returns the set of variables producing a string, as a bitmask
+    # memo maps substrings (of up to MEMO_SPAN symbols, and whole strings) to their variable sets,
+    # and is shared between calls, so that inputs with common substrings (or repeated inputs)
+    # reuse each other's work; it stops growing once it holds limit entries
+    # Strings longer than CHART_LENGTH go through chart() instead, which is faster on them
+    # Returns the set along with how many spans were found in the memo, and how many weren't
+    def variable_set(self, string: str, memo: dict, limit: int = None) -> tuple[int, int, int]:
+        if string in memo:
+            return memo[string], 1, 0
+
+        n, hits, misses = len(string), 0, 0
+        # Whether new entries still fit in the memo
+        room = limit is None or len(memo) < limit
+
+        if n > CHART_LENGTH:
+            produced = sum(1 << int(index) for index in np.flatnonzero(self.chart(string)[n, 1]))
+            if room:
+                memo[string] = produced
+            return produced, 0, 1
+
+        # spans[l][s] is the set of variables producing the span of length l starting at s
+        spans = [None, [self.terminal_masks.get(symbol, 0) for symbol in string]]
+
+        for l in range(2, n + 1):
+            row = []
+            memoized = l <= MEMO_SPAN
+            for s in range(n - l + 1):
+                produced = memo.get(string[s:s + l]) if memoized else None
+                if produced is None:
+                    misses += 1
+                    produced = 0
+                    for p in range(1, l):
+                        left = spans[p][s]
+                        if left:
+                            right = spans[l - p][s + p]
+                            if right:
+                                produced |= self.combine(left, right)
+                    if memoized and room:
+                        memo[string[s:s + l]] = produced
+                        room = limit is None or len(memo) < limit
+                else:
+                    hits += 1
+                row.append(produced)
+            spans.append(row)
+
+        produced = spans[n][0] if n > 0 else 0
+        if room:
+            memo[string] = produced
+        return produced, hits, misses
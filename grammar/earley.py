@@ -0,0 +1,115 @@
+from collections import defaultdict
+
+# Earley recognizer for general CFGs, in the same format as CFG's data
+# Unlike CYK, it needs no normal form, and it runs in linear time on most
+# unambiguous grammars, right recursion included thanks to Leo's optimization
+# Empty productions are handled by advancing past nullable variables
+# right when they are predicted (Aycock and Horspool's fix)
+class EarleyParser:
+
+    # Indexes the productions by their head
+    def __init__(self, data: dict):
+        self.start = data["variables"][0]
+        self.variables = set(data["variables"])
+        self.heads = [production["from"] for production in data["productions"]]
+        self.bodies = [production["to"] for production in data["productions"]]
+
+        self.by_head = defaultdict(list)
+        for index, head in enumerate(self.heads):
+            self.by_head[head].append(index)
+
+        # Variables that can produce the empty string
+        self.nullable, changed = set(), True
+        while changed:
+            changed = False
+            for head, body in zip(self.heads, self.bodies):
+                if head not in self.nullable and all(symbol in self.nullable for symbol in body):
+                    self.nullable.add(head)
+                    changed = True
+
+
+    # Checks whether a string belongs to the grammar
+    def recognize(self, string: str) -> bool:
+        n = len(string)
+        # Items are (production, dot position, origin), one list and one set per position
+        sets = [[] for _ in range(n + 1)]
+        seen = [set() for _ in range(n + 1)]
+        # Items of every position waiting for a variable, to be advanced once it is completed
+        waiting = [defaultdict(list) for _ in range(n + 1)]
+
+        def add(position: int, item: tuple) -> None:
+            if item not in seen[position]:
+                seen[position].add(item)
+                sets[position].append(item)
+
+        # Leo's deterministic reductions: topmost[j][B] is the completed item that completing
+        # B from position j ends up adding, when a chain of items each waiting for the next one's
+        # head as their last symbol (like in right recursion) leads to it, or None
+        # Only the topmost item of a chain is added, instead of every item along it
+        topmost = [dict() for _ in range(n + 1)]
+
+        # Returns the topmost item for a variable completed from position j, whose set is complete
+        def leo(j: int, variable: str) -> tuple | None:
+            # Follow the chain up, until a position already known or the end of the chain
+            chain, result = [], None
+            while variable not in topmost[j]:
+                waiters = waiting[j][variable]
+                if len(waiters) != 1 or waiters[0][1] + 1 != len(self.bodies[waiters[0][0]]):
+                    topmost[j][variable] = None
+                    break
+                production, dot, origin = waiters[0]
+                item = (production, dot + 1, origin)
+                chain.append((j, variable, item))
+                # Completed start items have to stay, for the string to be accepted
+                if origin == 0 and self.heads[production] == self.start:
+                    break
+                j, variable = origin, self.heads[production]
+            else:
+                result = topmost[j][variable]
+
+            for position, completed, item in reversed(chain):
+                result = result or item
+                topmost[position][completed] = result
+            return result
+
+        for production in self.by_head[self.start]:
+            add(0, (production, 0, 0))
+
+        for i in range(n + 1):
+            items, predicted = sets[i], set()
+            # The list grows while it is being processed
+            k = 0
+            while k < len(items):
+                production, dot, origin = items[k]
+                k += 1
+                body = self.bodies[production]
+
+                if dot == len(body):
+                    # Completion: skip to the topmost item of a deterministic chain, if there is one,
+                    # otherwise advance every item waiting for this variable where it started
+                    # (sets before this one are complete, so only their chains are known)
+                    if origin < i:
+                        item = leo(origin, self.heads[production])
+                        if item is not None:
+                            add(i, item)
+                            continue
+                    for waiting_production, waiting_dot, waiting_origin in waiting[origin][self.heads[production]]:
+                        add(i, (waiting_production, waiting_dot + 1, waiting_origin))
+                    continue
+
+                symbol = body[dot]
+                if symbol in self.variables:
+                    # Prediction, done only once per variable and position
+                    waiting[i][symbol].append((production, dot, origin))
+                    if symbol not in predicted:
+                        predicted.add(symbol)
+                        for other in self.by_head[symbol]:
+                            add(i, (other, 0, i))
+                    if symbol in self.nullable:
+                        add(i, (production, dot + 1, origin))
+                elif i < n and string[i] == symbol:
+                    # Scanning
+                    add(i + 1, (production, dot + 1, origin))
+
+        return any(origin == 0 and dot == len(self.bodies[production]) and self.heads[production] == self.start
+                   for production, dot, origin in sets[n])
@@ -0,0 +1,103 @@
+import numpy as np
+from grammar.compiled import CompiledGrammar
+
+# Shared packed parse forest of a string, built from its CYK chart
+# Nodes are (span length, span start, variable id), with the chart's 1-based lengths and starts
+# and 0-based variable ids, and every node is stored once, along with its packed alternatives:
+# the (split, left variable id, right variable id) ways of producing its span
+# Only nodes reachable from the root are built, so no back-pointers are needed while parsing
+class ParseForest:
+
+    # Builds the forest top-down from the root, which has to be in the chart
+    def __init__(self, grammar: CompiledGrammar, string: str, chart: np.ndarray):
+        self.grammar = grammar
+        self.string = string
+        self.root = (len(string), 1, 0)
+        self.nodes = dict()
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node in self.nodes:
+                continue
+            self.nodes[node] = self.alternatives(chart, *node)
+            for split, left, right in self.nodes[node]:
+                stack += [(split, node[1], left), (node[0] - split, node[1] + split, right)]
+
+
+    # Returns the ways a variable produces a span, ordered by split, then production,
+    # i.e. in the same order as the back-pointers of CFG.match_string
+    def alternatives(self, chart: np.ndarray, l: int, s: int, a: int) -> list[tuple[int, int, int]]:
+        if l == 1:
+            return []
+
+        productions = self.grammar.head_productions[a]
+        lefts, rights = self.grammar.lefts[productions], self.grammar.rights[productions]
+        splits = np.arange(1, l)
+        # Productions matched for every split, indexed by (split, production)
+        hits = chart[splits, s][:, lefts] & chart[l - splits, s + splits][:, rights]
+
+        return [(int(split) + 1, int(lefts[production]), int(rights[production]))
+                for split, production in zip(*np.nonzero(hits))]
+
+
+    # Returns the number of different parse trees, in time linear in the forest's size
+    # Counts are Python integers, so they don't overflow on very ambiguous grammars
+    def count(self) -> int:
+        counts = dict()
+        # Shorter spans first, so that both parts of an alternative are counted already
+        for node in sorted(self.nodes):
+            l, s, _ = node
+            if l == 1:
+                counts[node] = 1
+                continue
+            counts[node] = sum(counts[(split, s, left)] * counts[(l - split, s + split, right)]
+                               for split, left, right in self.nodes[node])
+        return counts[self.root]
+
+
+    # Builds a parse tree, taking the alternative given in choices at every binary node, in pre-order
+    # Binary nodes past the end of choices take their first alternative, which is added to choices
+    # Returns the tree and the number of alternatives of every binary node
+    def build(self, choices: list[int]) -> tuple[list, list[int]]:
+        variables = self.grammar.variables
+        tree, sizes = [variables[0]], []
+        stack = [(tree, self.root)]
+        while stack:
+            tree_node, node = stack.pop()
+            l, s, _ = node
+            if l == 1:
+                tree_node.append(self.string[s - 1])
+                continue
+
+            alternatives = self.nodes[node]
+            if len(sizes) == len(choices):
+                choices.append(0)
+            split, left, right = alternatives[choices[len(sizes)]]
+            sizes.append(len(alternatives))
+
+            left_tree, right_tree = [variables[left]], [variables[right]]
+            tree_node += [left_tree, right_tree]
+            # The left part is popped first
+            stack += [(right_tree, (l - split, s + split, right)), (left_tree, (split, s, left))]
+
+        return tree, sizes
+
+
+    # Lazily yields every parse tree, in the format of CFG.parse_tree, without recursion
+    # Trees are enumerated like an odometer over the choices made at every binary node,
+    # so each one takes time linear in its size, however many trees there are
+    def trees(self):
+        choices = []
+        while True:
+            tree, sizes = self.build(choices)
+            yield tree
+
+            # Move on to the next alternative of the last node that has one left,
+            # nodes after it are rebuilt from their first alternative
+            while choices and choices[-1] + 1 == sizes[-1]:
+                choices.pop()
+                sizes.pop()
+            if not choices:
+                return
+            choices[-1] += 1
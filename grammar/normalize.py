@@ -0,0 +1,146 @@
+# Conversion of general CFGs into Chomsky normal form
+# Productions are given as {"from": variable, "to": string of symbols}, where every
+# character of "to" is a symbol, and the first variable of the list is the start variable
+# New variables are named with single characters not used anywhere in the grammar yet
+
+# Returns True if a grammar is already in Chomsky normal form, in the sense the CYK algorithm needs:
+# every production either gives a terminal, or exactly two variables, except for
+# the start variable, which may give the empty string as long as it never appears on a right side
+def is_cnf(data: dict) -> bool:
+    variables, start = set(data["variables"]), data["variables"][0]
+    produces_empty = False
+    for production in data["productions"]:
+        produced = production["to"]
+        if len(produced) == 2 and all(symbol in variables for symbol in produced):
+            continue
+        if len(produced) == 1 and produced not in variables:
+            continue
+        if produced == "" and production["from"] == start:
+            produces_empty = True
+            continue
+        return False
+
+    # CYK doesn't handle empty productions, so an empty start variable used inside
+    # other productions has to go through to_cnf() instead
+    return not (produces_empty and any(start in production["to"] for production in data["productions"]))
+
+
+# Yields single characters not used by a grammar, to name new variables
+def fresh_symbols(data: dict):
+    used = set(data["variables"]) | set(data["terminals"])
+    for production in data["productions"]:
+        used |= set(production["to"])
+
+    # Capital letters first, then characters from the private use area
+    for code in list(range(ord("A"), ord("Z") + 1)) + list(range(0xE000, 0xF900)):
+        if chr(code) not in used:
+            yield chr(code)
+    raise ValueError("Ran out of symbols for new variables")
+
+
+# Returns the variables that can produce the empty string
+def nullable_variables(productions: list[tuple[str, str]]) -> set[str]:
+    nullable, changed = set(), True
+    while changed:
+        changed = False
+        for head, produced in productions:
+            if head not in nullable and all(symbol in nullable for symbol in produced):
+                nullable.add(head)
+                changed = True
+    return nullable
+
+
+# Converts a grammar into an equivalent one in Chomsky normal form, through the usual steps:
+# a new start variable, terminal lifting, binarisation, then removing empty and unit productions
+# If the grammar produces the empty string, the new start variable keeps an empty production
+def to_cnf(data: dict) -> dict:
+    fresh = fresh_symbols(data)
+    variables = list(data["variables"])
+    # Productions are (head, produced) pairs, kept in order and without duplicates
+    productions = list(dict.fromkeys((production["from"], production["to"]) for production in data["productions"]))
+
+    # A new start variable, which never appears on a right side
+    start = next(fresh)
+    variables.insert(0, start)
+    productions.insert(0, (start, data["variables"][0]))
+
+    # Terminal lifting: in productions with several symbols, terminals get a variable of their own
+    lifted = dict()
+    for index, (head, produced) in enumerate(productions):
+        if len(produced) < 2:
+            continue
+        symbols = []
+        for symbol in produced:
+            if symbol not in variables:
+                if symbol not in lifted:
+                    lifted[symbol] = next(fresh)
+                symbol = lifted[symbol]
+            symbols.append(symbol)
+        productions[index] = (head, "".join(symbols))
+    for terminal, variable in lifted.items():
+        variables.append(variable)
+        productions.append((variable, terminal))
+
+    # Binarisation: A -> X1 X2 ... Xk becomes A -> X1 N1, N1 -> X2 N2, ..., N(k-2) -> X(k-1) Xk
+    binary = []
+    for head, produced in productions:
+        while len(produced) > 2:
+            rest = next(fresh)
+            variables.append(rest)
+            binary.append((head, produced[0] + rest))
+            head, produced = rest, produced[1:]
+        binary.append((head, produced))
+    productions = binary
+
+    # Removing empty productions: add every way of leaving out nullable variables
+    nullable = nullable_variables(productions)
+    without_empty = []
+    for head, produced in productions:
+        if len(produced) == 2:
+            first, second = produced
+            if first in nullable:
+                without_empty.append((head, second))
+            if second in nullable:
+                without_empty.append((head, first))
+        if produced != "":
+            without_empty.append((head, produced))
+    productions = list(dict.fromkeys(without_empty))
+
+    # Removing unit productions: every variable gets the other productions
+    # of all the variables it can turn into through unit productions alone
+    unit_edges = {variable: [] for variable in variables}
+    others = {variable: [] for variable in variables}
+    for head, produced in productions:
+        (unit_edges if produced in unit_edges else others)[head].append(produced)
+
+    result = []
+    for variable in variables:
+        # Variables reachable through unit productions alone, breadth-first
+        order, seen = [variable], {variable}
+        for current in order:
+            for other in unit_edges[current]:
+                if other not in seen:
+                    seen.add(other)
+                    order.append(other)
+        for current in order:
+            result += [(variable, produced) for produced in others[current]]
+    if start in nullable:
+        result.append((start, ""))
+    productions = list(dict.fromkeys(result))
+
+    # Drop the variables that can't be reached from the start variable
+    reachable, stack = {start}, [start]
+    while stack:
+        current = stack.pop()
+        for head, produced in productions:
+            if head == current:
+                for symbol in produced:
+                    if symbol in unit_edges and symbol not in reachable:
+                        reachable.add(symbol)
+                        stack.append(symbol)
+
+    return {
+        "variables": [variable for variable in variables if variable in reachable],
+        "terminals": list(data["terminals"]),
+        "productions": [{"from": head, "to": produced} for head, produced in productions if head in reachable]
+    }
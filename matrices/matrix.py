@@ -1,5 +1,17 @@
+import numpy as np
+import os
+import struct
+
 COMMENT_SYMBOLS = ["#"]
 PATH = __file__.strip().rsplit("/", maxsplit=1)[0] + "/"
+# Bytes read at once by stream_matrix, and written at once when saving
+CHUNK_SIZE = 1 << 20
+
+# Binary matrix format: an 8 byte magic string, the dtype as 8 bytes of text (e.g. "<i8"),
+# the dimensions as two little-endian 64 bit integers, then the values in row-major order
+# The header is 32 bytes long, so values stay aligned for memory-mapping
+BINARY_MAGIC = b"MATRIX\x00\x01"
+BINARY_HEADER = struct.Struct("<8s8sQQ")
 
 # Check if the matrix dimensions are correct
 def valid_dimensions(m: int, n: int, A: list[list[int]]) -> bool:
@@ -64,6 +76,144 @@ def load_matrix(filename: str) -> tuple[int, int, list[list[int]]]:
         raise ValueError(f"Dimension mismatch: expected {m} by {n} matrix in input file")
 
 
+# Returns the error of the first invalid row of a matrix, given as lines of text
+# and the numbers of those lines in the file, or None if they are all valid
+def row_error(lines: list[bytes], numbers: list[int], n: int, dtype: type) -> str | None:
+    for line, number in zip(lines, numbers):
+        extracted = line.split()
+        if len(extracted) != n:
+            return f"Line {number}: expected {n} values, got {len(extracted)}"
+        try:
+            np.array(extracted, dtype=dtype)
+        except (ValueError, OverflowError):
+            return f"Line {number}: invalid value for {np.dtype(dtype).name}"
+    return None
+
+
+# Loads a matrix in the same format as load_matrix into a NumPy array, reading the file
+# in chunks of about CHUNK_SIZE bytes, so that only one chunk of text is in memory at once
+# Rows are written straight into an array allocated from the dimensions on the first line,
+# and every chunk is checked as it is read, errors giving the line's number
+def stream_matrix(filename: str, dtype: type = np.int64) -> tuple[int, int, np.ndarray]:
+    comments = tuple(symbol.encode() for symbol in COMMENT_SYMBOLS)
+    A, m, n, row, number = None, 0, 0, 0, 0
+
+    with open(filename, "rb") as file:
+        while True:
+            lines = file.readlines(CHUNK_SIZE)
+            if not lines:
+                break
+
+            # The chunk's rows, and the numbers of the lines they come from
+            rows, numbers = [], []
+            for line in lines:
+                number += 1
+                stripped = line.strip()
+                # Skip comments and blank lines
+                if stripped == b"" or stripped.startswith(comments):
+                    continue
+
+                # First line contains the dimensions
+                if A is None:
+                    try:
+                        m, n = map(int, stripped.split())
+                    except ValueError:
+                        raise ValueError(f"Line {number}: expected the matrix dimensions \"m n\"")
+                    if m < 0 or n < 0:
+                        raise ValueError(f"Line {number}: invalid dimensions {m} by {n}")
+                    A = np.empty((m, n), dtype=dtype)
+                    continue
+
+                if row + len(rows) == m:
+                    raise ValueError(f"Line {number}: expected {m} rows, got more")
+                rows.append(line)
+                numbers.append(number)
+
+            if not rows:
+                continue
+            # NumPy's parser reads the whole chunk at once, and only if it fails
+            # (or finds the wrong number of columns) are the rows checked one by one
+            try:
+                values = np.loadtxt(rows, dtype=dtype, comments=None, ndmin=2)
+            except (ValueError, OverflowError):
+                values = None
+            if values is None or values.shape != (len(rows), n):
+                raise ValueError(row_error(rows, numbers, n, dtype) or f"Line {numbers[0]}: invalid rows")
+            A[row:row + len(rows)] = values
+            row += len(rows)
+
+    if A is None:
+        raise ValueError("Missing matrix dimensions")
+    if row != m:
+        raise ValueError(f"Dimension mismatch: expected {m} rows, got {row}")
+    return m, n, A
+
+
+# Saves a matrix (a NumPy array, or a list of lists) in the binary format,
+# writing about CHUNK_SIZE bytes at a time
+def save_binary_matrix(A: np.ndarray | list[list[int]], filename: str, dtype: type = None) -> None:
+    A = np.asarray(A, dtype=dtype)
+    if A.ndim != 2:
+        raise ValueError(f"Dimension mismatch: expected a matrix, got an array with {A.ndim} dimensions")
+    if A.dtype.hasobject:
+        raise ValueError("Matrices of Python objects can't be saved in the binary format")
+
+    # Values are always saved in little-endian order
+    A = A.astype(A.dtype.newbyteorder("<"), copy=False)
+    m, n = A.shape
+    rows = max(1, CHUNK_SIZE // max(1, n * A.dtype.itemsize))
+
+    with open(filename, "wb") as file:
+        file.write(BINARY_HEADER.pack(BINARY_MAGIC, A.dtype.str.encode(), m, n))
+        for row in range(0, m, rows):
+            file.write(np.ascontiguousarray(A[row:row + rows]).tobytes())
+
+
+# Loads a matrix saved in the binary format
+# With mmap set, the file is memory-mapped instead of read: nothing is loaded until it is
+# accessed, so slicing rows only reads those rows, and the array is read-only
+def load_binary_matrix(filename: str, mmap: bool = True) -> tuple[int, int, np.ndarray]:
+    with open(filename, "rb") as file:
+        header = file.read(BINARY_HEADER.size)
+    if len(header) != BINARY_HEADER.size or header[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ValueError(f"{filename} is not a binary matrix file")
+
+    _, dtype, m, n = BINARY_HEADER.unpack(header)
+    dtype = np.dtype(dtype.rstrip(b"\x00").decode())
+    expected = BINARY_HEADER.size + m * n * dtype.itemsize
+    if os.path.getsize(filename) != expected:
+        raise ValueError(f"Dimension mismatch: expected {m} by {n} {dtype.name} matrix, "
+                         f"but the file has {os.path.getsize(filename)} bytes instead of {expected}")
+
+    # Memory-mapping an empty file fails, so empty matrices are always read
+    if mmap and m * n > 0:
+        A = np.memmap(filename, dtype=dtype, mode="r", offset=BINARY_HEADER.size, shape=(m, n))
+    else:
+        A = np.fromfile(filename, dtype=dtype, offset=BINARY_HEADER.size).reshape(m, n)
+    return m, n, A
+
+
+# Converts a matrix from the text format to the binary one
+def text_to_binary(text_filename: str, binary_filename: str, dtype: type = np.int64) -> None:
+    _, _, A = stream_matrix(text_filename, dtype)
+    save_binary_matrix(A, binary_filename)
+
+
+# Converts a matrix from the binary format to the text one, a chunk of rows at a time
+def binary_to_text(binary_filename: str, text_filename: str) -> None:
+    m, n, A = load_binary_matrix(binary_filename)
+    # Booleans are written as 0 and 1, like in the text format
+    if A.dtype.kind == "b":
+        A = A.astype(np.uint8)
+    rows = max(1, CHUNK_SIZE // max(1, 8 * n))
+
+    with open(text_filename, "w") as file:
+        file.write(f"{m} {n}\n")
+        for row in range(0, m, rows):
+            # Python's own number formatting, which gives floats back exactly when read
+            file.writelines(" ".join(map(str, line)) + "\n" for line in A[row:row + rows].tolist())
+
+
 if __name__ == "__main__":
     m, n, A = load_matrix(PATH + "matrix.in")
     print(f"Got {m} by {n} matrix: {A}")